@@ -0,0 +1,233 @@
+"""
+Local stand-in for the UCI catalog, for exercising course_into_scraper.py offline.
+
+GET /allcourses/<department>/ serves <pages>/<department>.html from a directory of
+catalog pages saved from the live site (course_into_scraper.py --save-pages). Every page
+carries an ETag and Last-Modified, conditional requests are answered 304 Not Modified,
+and an injected latency shows the effect of concurrent fetches.
+
+--check scrapes the saved pages serially, concurrently and conditionally, and compares
+the courses with <pages>/expected.json if there is one, otherwise with course_data.json,
+which was scraped from the same site. --render serves pages generated from
+course_data.json instead; that markup is written to the scraper's own expectations, so
+it only exercises fetching and caching, not parsing.
+
+fixtures/catalog_pages ships with a trimmed set of department pages and their
+expected.json, so --check runs with no setup; see fixtures/catalog_pages/README.md.
+
+    python course_into_scraper.py --save-pages fixtures/catalog_pages   # capture once
+    python catalog_fixture_server.py --check [--pages fixtures/catalog_pages]
+    python catalog_fixture_server.py [--port 8766] [--latency 0.3] [--render]
+"""
+import argparse
+import hashlib
+import html
+import json
+import os
+import re
+import sys
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PATH_RE = re.compile(r"^/allcourses/([a-z0-9_]+)/?$")
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "catalog_pages")
+# Courses a page directory is expected to scrape to, when it is not whole departments
+EXPECTED_FILE = "expected.json"
+
+
+def department_slug(subject):
+    """Catalog slug of a subject, e.g. "I&C SCI" -> "i_c_sci"."""
+    return re.sub(r"[^a-z0-9]+", "_", subject.lower()).strip("_")
+
+
+def render_course(course_id, course):
+    """One course in courseblock markup shaped to what the scraper reads (for --render)."""
+    e = html.escape
+    paragraphs = [f"<p>{e(course['description'])}</p>"]
+    if course["prerequisites"] != "N/A":
+        paragraphs.append(f"<p><strong>Prerequisite</strong>: {e(course['prerequisites'])}</p>")
+    if course["same_as"] != "N/A":
+        paragraphs.append(f"<p>Same as {e(course['same_as'])}</p>")
+    if course["overlaps_with"] != "N/A":
+        paragraphs.append(f"<p>Overlaps with {e(course['overlaps_with'])}</p>")
+    if course["restriction"] != "N/A":
+        paragraphs.append(f"<p><strong>Restriction</strong>{e(course['restriction'])}</p>")
+    if course["grading_option"] != "N/A":
+        paragraphs.append(f"<p>Grading Option: {e(course['grading_option'])}</p>")
+    unit_word = "Unit" if course["units"] == "1" else "Units"
+    return (
+        '<div class="courseblock">\n'
+        f'<p class="courseblocktitle"><strong>{e(course_id)}.  {e(course["title"])}.  '
+        f'{e(course["units"])} {unit_word}.</strong></p>\n'
+        '<div class="courseblockdesc">\n' + "\n".join(paragraphs) + "\n</div>\n</div>"
+    )
+
+
+def render_pages(courses):
+    """{department slug: page HTML} for every subject in courses."""
+    blocks = {}
+    for course_id, course in courses.items():
+        subject = course_id.rsplit(" ", 1)[0]
+        blocks.setdefault(department_slug(subject), []).append(render_course(course_id, course))
+    return {
+        slug: f"<html><head><title>{slug}</title></head><body><div id=\"content\">\n" + "\n".join(items) + "\n</div></body></html>"
+        for slug, items in blocks.items()
+    }
+
+
+def load_pages(pages_dir):
+    """{department slug: page HTML} from a directory of saved <slug>.html pages."""
+    pages = {}
+    for name in os.listdir(pages_dir):
+        if name.endswith(".html"):
+            with open(os.path.join(pages_dir, name), "r", encoding="utf-8") as f:
+                pages[name[:-5]] = f.read()
+    return pages
+
+
+class CatalogHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        match = PATH_RE.match(self.path)
+        page = server.pages.get(match.group(1)) if match else None
+        with server.lock:
+            server.requests += 1
+        time.sleep(server.latency)
+
+        if page is None:
+            self.send_error(404)
+            return
+        body, etag = page
+        if self.not_modified(etag):
+            with server.lock:
+                server.not_modified += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", self.server.last_modified)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def not_modified(self, etag):
+        # If-None-Match takes precedence over If-Modified-Since when both are sent
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                return parsedate_to_datetime(if_modified_since).timestamp() >= self.server.modified_at
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(pages, port=0, latency=0.0):
+    """Bind the fixture server (port 0 picks a free one) over {slug: html} without starting it."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), CatalogHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.lock = threading.Lock()
+    server.requests = server.not_modified = 0
+    server.modified_at = int(time.time())
+    server.last_modified = formatdate(server.modified_at, usegmt=True)
+    server.pages = {}
+    for slug, text in pages.items():
+        body = text.encode("utf-8")
+        server.pages[slug] = (body, f'"{hashlib.sha256(body).hexdigest()[:16]}"')
+    return server
+
+
+def serve_in_thread(pages, **options):
+    """Start a fixture server on a background thread; returns (server, base url). Stop with server.shutdown()."""
+    server = make_server(pages, **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    return server, f"http://{host}:{port}"
+
+
+def check(pages, courses, latency):
+    """Scrape the pages serially, concurrently and again conditionally; compare with courses."""
+    from course_into_scraper import PARSER, scrape_departments
+
+    departments = sorted(pages)
+    # Only the departments with a page are expected back
+    expected = {cid: c for cid, c in courses.items() if department_slug(cid.rsplit(" ", 1)[0]) in pages}
+    server, base_url = serve_in_thread(pages, latency=latency)
+    try:
+        runs = {}
+        for label, workers, cache in (("serial", 1, None), ("concurrent", len(departments), {})):
+            start = time.perf_counter()
+            runs[label] = scrape_departments(departments, base_url, workers, cache)
+            print(f"  {label}: {time.perf_counter() - start:.2f}s")
+        requests_before = server.not_modified
+        start = time.perf_counter()
+        runs["re-scrape"] = scrape_departments(departments, base_url, len(departments), cache)
+        not_modified = server.not_modified - requests_before
+        print(f"  conditional re-scrape: {time.perf_counter() - start:.2f}s, "
+              f"{not_modified} of {len(departments)} pages not modified")
+    finally:
+        server.shutdown()
+
+    failed = not_modified != len(departments)
+    for label, scraped in runs.items():
+        differing = [cid for cid in expected if scraped.get(cid) != expected[cid]]
+        extra = [cid for cid in scraped if cid not in expected]
+        failed = failed or bool(differing or extra)
+        print(f"{label}: {len(scraped)} courses scraped, {len(expected)} expected, "
+              f"{len(differing)} differing or missing, {len(extra)} unexpected (parser: {PARSER})")
+        for cid in differing[:5]:
+            print(f"  {cid}: scraped {scraped.get(cid)}\n  {' ' * len(cid)}  expected {expected[cid]}")
+        for cid in extra[:5]:
+            print(f"  {cid}: not in the expected course data")
+    return not failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve saved UCI catalog pages with ETag support")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--pages", default=PAGES_DIR, help="Directory of saved <department>.html pages")
+    parser.add_argument("--render", action="store_true", help="Serve pages generated from --courses instead")
+    parser.add_argument("--courses", default=None,
+                        help="Course data to compare with or render (default: <pages>/expected.json, else course_data.json)")
+    parser.add_argument("--latency", type=float, default=0.3, help="Seconds added to every response")
+    parser.add_argument("--check", action="store_true", help="Scrape the pages and compare with --courses")
+    args = parser.parse_args()
+
+    if args.courses is None:
+        expected_path = os.path.join(args.pages, EXPECTED_FILE)
+        args.courses = expected_path if not args.render and os.path.exists(expected_path) else "course_data.json"
+    with open(args.courses, "r", encoding="utf-8") as f:
+        courses = json.load(f)
+    if args.render:
+        pages = render_pages(courses)
+    elif os.path.isdir(args.pages) and load_pages(args.pages):
+        pages = load_pages(args.pages)
+    else:
+        print(f"No saved pages in {args.pages}; capture them with "
+              f"python course_into_scraper.py --save-pages {args.pages}, or pass --render")
+        sys.exit(1)
+
+    if args.check:
+        sys.exit(0 if check(pages, courses, args.latency) else 1)
+
+    server = make_server(pages, args.port, args.latency)
+    print(f"Catalog fixture serving {', '.join(sorted(pages))} on http://127.0.0.1:{args.port}/allcourses/<department>/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\nServed {server.requests} requests ({server.not_modified} not modified)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,13 @@
 import json
 import os
 import time
-import re
-import google.generativeai as genai
-from dotenv import load_dotenv
 import ast
+import argparse
+from llm_pipeline import GeminiBackend, HTTPBackend, has_prereqs, parse_texts
+from delta_ingest import HASH_FIELD, diff_courses, load_previous, normalize_prereq_text, prereq_hash, print_delta, reuse_unchanged
+from parse_cache import ParseCache, prompt_namespace
+from prereq_grammar import parse_prerequisites
+from journal import ConversionJournal, resumable
 
 def read_gemini_prompt():
     """Read the Gemini prompt template from file."""
@@ -22,6 +25,7 @@ def read_gemini_prompt():
 def initialize_gemini():
     """Initialize and configure the Gemini model."""
     print("Initializing Gemini model...")
+    from dotenv import load_dotenv
     load_dotenv()  # Load environment variables from .env file
     api_key = os.getenv('GOOGLE_API_KEY')
     
@@ -29,154 +33,150 @@ def initialize_gemini():
         print("Warning: GOOGLE_API_KEY environment variable is not set. LLM validation will be skipped.")
         return None
     
+    # Only the Gemini backend needs the Google SDK
+    import google.generativeai as genai
     genai.configure(api_key=api_key)
     model = genai.GenerativeModel('gemini-2.0-flash-lite')
     print("Gemini model initialized successfully")
     return model
 
-# Track API calls for rate limiting
-api_calls = {
-    'count': 0,
-    'last_reset_time': time.time(),
-    'minute_count': 0
-}
+def make_backend(url=None):
+    """The LLM backend: an HTTP endpoint if url is given, otherwise Gemini (None without a key)."""
+    if url:
+        print(f"Using HTTP LLM backend at {url}")
+        return HTTPBackend(url)
+    model = initialize_gemini()
+    return GeminiBackend(model) if model else None
 
-def parse_with_gemini(model, prompt_template, prereq_text):
-    """
-    Use Gemini to parse prerequisite text into logical structure.
-    Implements rate limiting to prevent API rate limit errors.
+def convert_prereqs_to_logical_structure(json_data, output_file, previous=None, url=None,
+                                         workers=4, requests_per_minute=14, tokens_per_minute=1_000_000,
+                                         cache_file="prereq_parse_cache.jsonl", resume=False):
     """
-    if not prereq_text or prereq_text == "N/A":
-        print("  No prerequisites to parse")
-        return "N/A"
-    
-    if not model:
-        print("  Skipping LLM parsing (no model available)")
-        return "N/A"
-    
-    # Rate limiting logic - max 15 RPM (requests per minute)
-    current_time = time.time()
-    
-    # Reset the counter if a minute has passed
-    if current_time - api_calls['last_reset_time'] >= 60:
-        print(f"Resetting API rate limit counter (was {api_calls['minute_count']})")
-        api_calls['last_reset_time'] = current_time
-        api_calls['minute_count'] = 0
-    
-    # Check if we're at the rate limit
-    if api_calls['minute_count'] >= 14:  # Keep a buffer of 1 below the actual limit
-        wait_time = 60 - (current_time - api_calls['last_reset_time'])
-        if wait_time > 0:
-            print(f"Rate limit reached. Waiting for {wait_time:.2f} seconds...")
-            time.sleep(wait_time + 1)  # Add 1 second buffer
-            # Reset after waiting
-            api_calls['last_reset_time'] = time.time()
-            api_calls['minute_count'] = 0
-    
-    # Prepare the prompt with the current prereq text
-    prompt = f"{prompt_template}\n\nPrerequisite Text: {prereq_text}"
-    
-    try:
-        print(f"  Sending API request for: {prereq_text[:100]}{'...' if len(prereq_text) > 100 else ''}")
-        response = model.generate_content(
-            prompt,
-            generation_config=genai.types.GenerationConfig(temperature=0.0),
-            stream=False
-        )
-        
-        # Update API call tracking
-        api_calls['count'] += 1
-        api_calls['minute_count'] += 1
-        
-        print(f"  API call successful. Total calls: {api_calls['count']}, Minute count: {api_calls['minute_count']}")
-        
-        # Extract the result from the response
-        result_text = response.text.strip()
-        print(f"  LLM raw output: {result_text}")
-        
-        # If the response is just "N/A" (with or without quotes), return "N/A"
-        if result_text in ['"N/A"', "'N/A'", "N/A"]:
-            return "N/A"
-        
-        # Clean up any markdown code block formatting
-        cleaned_text = re.sub(r'^```(?:json)?\s*', '', result_text)
-        cleaned_text = re.sub(r'\s*```$', '', cleaned_text)
-        
-        # Handle the response based on content type
-        try:
-            # First try parsing as JSON
-            final_result = json.loads(cleaned_text)
-            print(f"  Successfully parsed as JSON")
-            return final_result
-        except json.JSONDecodeError as json_err:
-            # Try to read it as a string and load it as a Python literal
-            print(f"  JSON parsing error: {json_err}")
-            final_result = f'{cleaned_text}'
-            print(f"  Successfully parsed as Python literal")
-            return final_result
+    Process each course in the JSON data to convert prerequisites to logical structure.
 
-            
-    except Exception as e:
-        print(f"  Error with LLM parsing: {e}")
-        return "N/A"
+    With previous (the last run's output), only courses whose prerequisite text is new or
+    changed since then are sent to the LLM; the rest reuse their previous parse. Of those,
+    text the local grammar parser handles, or found in the parse cache (cache_file, None to
+    disable), is not sent either, and courses sharing identical text share a single call. Calls run concurrently through
+    llm_pipeline, within the given requests/tokens per minute.
 
-def convert_prereqs_to_logical_structure(json_data, output_file):
-    """
-    Process each course in the JSON data to convert prerequisites to logical structure.
+    Every parse is appended to a journal next to output_file as it is made. With resume,
+    courses already journaled by an interrupted run (and unchanged since) are not parsed
+    again. The journal is compacted into output_file at the end.
     """
-    # Initialize Gemini model
-    model = initialize_gemini()
-    prompt_template = read_gemini_prompt()
-    
-    # Process each course
-    processed_count = 0
-    total_courses = len(json_data)
-    print(f"Starting processing of {total_courses} courses...")
-    
+    delta = diff_courses(json_data, previous or {})
+    print_delta(delta)
+    reuse_unchanged(json_data, previous or {}, delta)
+    journal = ConversionJournal(output_file, resume=resume)
+    to_parse = delta["new"] + delta["changed"]
+    if resume:
+        done = set(resumable(journal.records, {course_id: json_data[course_id] for course_id in to_parse}))
+        to_parse = [course_id for course_id in to_parse if course_id not in done]
+        journal.apply(json_data, done)
+        print(f"Resuming from {journal.path}: {len(done)} courses already parsed ({journal.skipped_lines} unreadable lines)")
+    texts = [json_data[course_id].get("prerequisites", "N/A") for course_id in to_parse]
+
+    prompt_template, cache = "", None
+    if any(has_prereqs(text) for text in texts):
+        prompt_template = read_gemini_prompt()
+        if cache_file:
+            cache = ParseCache(cache_file, prompt_namespace(prompt_template))
+            print(f"Loaded {len(cache)} cached parses from {cache_file}")
+    
+    total_courses = len(to_parse)
+    print(f"Starting processing of {total_courses} courses ({len(delta['unchanged'])} reused)...")
     start_time = time.time()
-    
-    for course_id, course_data in json_data.items():
+    processed_count = 0
+
+    def apply(index, parsed_prereqs, ok):
+        nonlocal processed_count
         processed_count += 1
-        print(f"\n[{processed_count}/{total_courses}] Processing course: {course_id}")
-        
-        prereq_text = course_data.get("prerequisites", "N/A")
-        print(f"  Original prerequisites: {prereq_text}")
-        
-        # Parse prerequisites using Gemini
-        parsed_prereqs = parse_with_gemini(model, prompt_template, prereq_text)
-        print(f"  Parsed prerequisites: {parsed_prereqs}")
-        
-        # Update the course data with the structured prerequisites
+        course_data = json_data[to_parse[index]]
+        print(f"[{processed_count}/{total_courses}] {to_parse[index]}: {parsed_prereqs}")
         course_data["parsed_prerequisites"] = parsed_prereqs
+
+        # Only record the hash of a real parse, so failed or skipped calls are retried next run
+        course_data[HASH_FIELD] = prereq_hash(texts[index]) if ok else None
+        journal.record(to_parse[index], parsed_prereqs, course_data[HASH_FIELD])
         
-        # Progress tracking and periodic saving
+        # Progress tracking
         if processed_count % 10 == 0:
-            current_time = time.time()
-            elapsed_time = current_time - start_time
+            elapsed_time = time.time() - start_time
             avg_time_per_course = elapsed_time / processed_count
             estimated_time_remaining = avg_time_per_course * (total_courses - processed_count)
             
             print(f"\n>>> Progress update: Processed {processed_count}/{total_courses} courses ({processed_count/total_courses*100:.1f}%)")
             print(f">>> Elapsed time: {elapsed_time:.1f}s, Est. time remaining: {estimated_time_remaining:.1f}s (~{estimated_time_remaining/60:.1f} min)")
-            
-            # Periodically save in case of interruption
-            with open(f"{output_file}.partial", 'w', encoding='utf-8') as f:
-                json.dump(json_data, f, indent=4)
-            print(f"Saved intermediate results to {output_file}.partial")
-    
-    # Save the final updated data to the output JSON file
+
+    # Settle everything that needs no call, then group the rest by normalised text
+    groups, local = {}, 0
+    for index, text in enumerate(texts):
+        parsed = parse_prerequisites(text) if has_prereqs(text) else None
+        cached = cache.get(text) if cache is not None and has_prereqs(text) and parsed is None else None
+        if not has_prereqs(text):
+            apply(index, "N/A", True)
+        elif parsed is not None:
+            local += 1
+            apply(index, parsed, True)
+        elif cached is not None:
+            apply(index, cached, True)
+        else:
+            groups.setdefault(normalize_prereq_text(text), []).append(index)
+    unique = list(groups)
+
+    def on_result(position, parsed_prereqs, ok):
+        if ok and cache is not None:
+            cache.put(unique[position], parsed_prereqs)
+        for index in groups[unique[position]]:
+            apply(index, parsed_prereqs, ok)
+
+    # The model is only needed if something has to be parsed
+    backend = make_backend(url) if unique else None
+    if backend is None:
+        if unique:
+            print("Skipping LLM parsing (no model available)")
+        for position in range(len(unique)):
+            on_result(position, "N/A", False)
+    else:
+        parse_texts(
+            backend, prompt_template, unique,
+            workers=workers,
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+            on_result=on_result
+        )
+
+    print(f"Parsed {local} courses locally with the prerequisite grammar")
+    if cache is not None:
+        cache.close()
+        duplicates = sum(len(indices) - 1 for indices in groups.values())
+        print(f"Parse cache: {cache.hits} hits, {cache.misses} misses ({cache.hit_rate()*100:.1f}% hit rate), "
+              f"{duplicates} duplicate texts within this run, {len(unique)} texts sent to the LLM, {cache.stored} new entries")
+    
+    # Compact the journal into the final output JSON file
     print(f"\nProcessing complete. Saving final results to {output_file}...")
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(json_data, f, indent=4)
+    journal.compact(json_data)
     
-    print(f"Completed processing {processed_count} courses. Output saved to {output_file}")
-    print(f"Total API calls made: {api_calls['count']}")
+    print(f"Completed processing {total_courses} courses. Output saved to {output_file}")
 
 def main():
     """Main function to process course data."""
+    parser = argparse.ArgumentParser(description="Parse course prerequisites into logical structures")
+    parser.add_argument("--input", default="course_data.json", help="Scraped course data")
+    parser.add_argument("--output", default="course_data_with_logical_prereqs.json", help="Parsed output, also the previous run to reuse")
+    parser.add_argument("--full", action="store_true", help="Re-parse every course instead of only new or changed ones")
+    parser.add_argument("--url", default=None, help="JSON LLM endpoint to use instead of Gemini (e.g. fake_llm_server.py)")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent LLM calls")
+    parser.add_argument("--rpm", type=float, default=14, help="Requests per minute allowed by the provider")
+    parser.add_argument("--tpm", type=float, default=1_000_000, help="Tokens per minute allowed by the provider")
+    parser.add_argument("--cache", default="prereq_parse_cache.jsonl", help="Parse cache file shared across runs")
+    parser.add_argument("--no-cache", action="store_true", help="Neither read nor write the parse cache")
+    parser.add_argument("--resume", action="store_true", help="Skip courses already in the journal of an interrupted run")
+    args = parser.parse_args()
+
     print("=== Starting Course Prerequisite Processing ===")
-    input_file = "course_data.json"
-    output_file = "course_data_with_logical_prereqs.json"
+    input_file = args.input
+    output_file = args.output
     
     # Load the course data
     print(f"Loading course data from {input_file}...")
@@ -193,7 +193,12 @@ def main():
     
     # Process the data
     start_time = time.time()
-    convert_prereqs_to_logical_structure(json_data, output_file)
+    previous = None if args.full else load_previous(output_file)
+    convert_prereqs_to_logical_structure(
+        json_data, output_file, previous,
+        url=args.url, workers=args.workers, requests_per_minute=args.rpm, tokens_per_minute=args.tpm,
+        cache_file=None if args.no_cache else args.cache, resume=args.resume
+    )
     end_time = time.time()
     
     print(f"=== Processing Complete ===")
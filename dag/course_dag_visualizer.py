@@ -1,4 +1,3 @@
-import json
 import networkx as nx
 import matplotlib.pyplot as plt
 from matplotlib.patches import Polygon, FancyBboxPatch
@@ -8,6 +7,7 @@ import numpy as np
 import argparse
 import re
 import os
+from course_store import CourseStore
 
 class CoursePrereqVisualizer:
     def __init__(self, json_file='course_data_with_logical_prereqs.json'):
@@ -18,10 +18,9 @@ class CoursePrereqVisualizer:
         self.group_counter = 0  # Counter for generating unique OR group IDs
         
     def load_course_data(self, json_file):
-        """Load course data from JSON file."""
+        """Open the indexed course store for the JSON file (only prerequisites stay in memory)."""
         try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return CourseStore(json_file)
         except Exception as e:
             print(f"Error loading course data: {e}")
             return {}
@@ -114,7 +113,7 @@ class CoursePrereqVisualizer:
                 
             # Get the prerequisites for this course
             if course in self.courses:
-                prereq_structure = self.courses[course].get("parsed_prerequisites", "N/A")
+                prereq_structure = self.courses.prerequisites(course)
                 prereq_nodes = self.parse_prerequisites(prereq_structure, course)
                 
                 # Connect prerequisites to the course
@@ -234,6 +233,32 @@ class CoursePrereqVisualizer:
         self.visualize(target_course, save_path=save_path)
         return save_path
 
+    def all_prerequisites(self, target_course, depth=None):
+        """
+        Every course the target ultimately requires, grouped by shortest distance.
+        
+        Answered from the course store's closure index instead of walking the graph.
+        
+        Args:
+            target_course: The course to look up
+            depth: Only include prerequisites at most this many steps away (default: all)
+            
+        Returns:
+            Dict of {distance: [course IDs]}
+        """
+        closure = self.courses.closure()
+        if target_course not in closure.index:
+            return {}
+        return {d: courses for d, courses in sorted(closure.levels(target_course).items())
+                if depth is None or d <= depth}
+    
+    def unlocked_courses(self, course):
+        """Every course that directly or transitively lists this course as a prerequisite."""
+        closure = self.courses.closure()
+        if course not in closure.index:
+            return []
+        return sorted(closure.descendants(course))
+
 def search_courses(course_data, search_term):
     """Search for courses matching the search term."""
     search_term = search_term.upper()
@@ -248,13 +273,28 @@ def search_courses(course_data, search_term):
 def main():
     parser = argparse.ArgumentParser(description='Visualize course prerequisites.')
     parser.add_argument('course', nargs='?', help='Course ID to visualize (e.g., "COMPSCI 161")')
-    parser.add_argument('--depth', type=int, default=2, help='Depth of prerequisite chain to visualize')
+    parser.add_argument('--depth', type=int, default=None, help='Depth of prerequisite chain to visualize (default: 2, all for --requires)')
     parser.add_argument('--search', action='store_true', help='Search for courses matching the input')
     parser.add_argument('--save', action='store_true', help='Save the graph instead of displaying it')
+    parser.add_argument('--requires', action='store_true', help='List everything the course ultimately requires')
+    parser.add_argument('--unlocks', action='store_true', help='List everything the course unlocks')
     args = parser.parse_args()
 
     visualizer = CoursePrereqVisualizer(json_file='course_data_with_logical_prereqs.json')
     
+    if args.requires and args.course:
+        levels = visualizer.all_prerequisites(args.course, args.depth)
+        for distance, courses in levels.items():
+            print(f"{distance} step(s) away: {', '.join(sorted(courses))}")
+        if not levels:
+            print(f"{args.course} has no prerequisites")
+        return
+    
+    if args.unlocks and args.course:
+        unlocked = visualizer.unlocked_courses(args.course)
+        print(f"{args.course} unlocks {len(unlocked)} course(s): {', '.join(unlocked)}")
+        return
+    
     if args.search and args.course:
         matches = search_courses(visualizer.courses, args.course)
         if matches:
@@ -285,20 +325,20 @@ def main():
             else:
                 if query in visualizer.courses:
                     if args.save:
-                        path = visualizer.save_course_graph(query, depth=args.depth)
+                        path = visualizer.save_course_graph(query, depth=args.depth or 2)
                         print(f"Graph saved to {path}")
                     else:
                         print(f"Building graph for {query}...")
-                        visualizer.visualize_recursive_prerequisites(query, depth=args.depth)
+                        visualizer.visualize_recursive_prerequisites(query, depth=args.depth or 2)
                 else:
                     print(f"Course '{query}' not found. Use 'search' to find courses.")
     else:
         if args.course in visualizer.courses:
             if args.save:
-                path = visualizer.save_course_graph(args.course, depth=args.depth)
+                path = visualizer.save_course_graph(args.course, depth=args.depth or 2)
                 print(f"Graph saved to {path}")
             else:
-                visualizer.visualize_recursive_prerequisites(args.course, depth=args.depth)
+                visualizer.visualize_recursive_prerequisites(args.course, depth=args.depth or 2)
         else:
             print(f"Course '{args.course}' not found.")
 
@@ -1,90 +1,113 @@
-import requests
-from bs4 import BeautifulSoup
+"""
+Scrape course information from the UCI catalog into course_data.json.
+
+Department pages are fetched concurrently over one pooled requests session. Each page's
+ETag / Last-Modified is kept in a page cache (scrape_cache.json) together with the
+courses parsed from it, so a re-scrape sends conditional requests and a page the server
+answers 304 Not Modified is neither downloaded nor parsed again. Pages are parsed with
+lxml when it is installed, falling back to the pure-Python html.parser.
+
+    python course_into_scraper.py [--departments compsci math ...] [--workers 8]
+    python course_into_scraper.py --save-pages fixtures/catalog_pages   # pages for the fixture server
+    python course_into_scraper.py --base-url http://127.0.0.1:8766   # catalog_fixture_server.py
+"""
+import argparse
+import importlib.util
 import json
+import os
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from bs4 import BeautifulSoup, SoupStrainer
+from requests.adapters import HTTPAdapter
+
+BASE_URL = 'https://catalogue.uci.edu'
+DEPARTMENTS = ['compsci', 'i_c_sci', 'in4matx', 'stats', 'math']
+
+# lxml builds the same tree several times faster than html.parser, when available
+PARSER = 'lxml' if importlib.util.find_spec('lxml') else 'html.parser'
+# Only course blocks are turned into a tree, not the page's navigation and layout
+COURSE_BLOCKS = SoupStrainer('div', class_='courseblock')
+# Title format: "SUBJECT NUM. Title. Units."
+TITLE_RE = re.compile(r'([A-Z0-9&_\s]+)\s+([H]?\d+[A-Z]?(?:LA|LB|L|W|S)?)\.\s+(.*?)\.\s+(\d+(?:-\d+)?(?:\.\d+)?)\s+((?:Workload )?Units?)\.\s*')
 
 def clean_text(text):
-    """Replace non-breaking spaces with regular spaces."""
+    """Collapse all whitespace, including non-breaking spaces and newlines, to single spaces."""
     if isinstance(text, str):
-        # Remove \u00a0 (non-breaking space), leading/trailing whitespace, and any characters that comes after '.\n' and '.\n' themselves
-        return re.sub(r'\s+', ' ', text.replace('\u00a0', ' ').strip()).replace('.\n', '').replace('\n', '')
+        return ' '.join(text.split())
     return text
 
-def scrape_course_catalog(url):
-    """Scrape course information from a UCI catalog page."""
-    response = requests.get(url)
-    if response.status_code != 200:
-        print(f"Failed to retrieve data from {url}")
-        return {}
-    
-    soup = BeautifulSoup(response.text, 'html.parser')
+def department_url(department, base_url=BASE_URL):
+    return f"{base_url.rstrip('/')}/allcourses/{department}/"
+
+def parse_course_catalog(html):
+    """Parse the course blocks of a UCI catalog page."""
+    soup = BeautifulSoup(html, PARSER, parse_only=COURSE_BLOCKS)
     course_blocks = soup.find_all('div', class_='courseblock')
-    
+
     courses = {}
-    
+
     for course_block in course_blocks:
         # Extract course title block
         title_block = course_block.find('p', class_='courseblocktitle')
         if not title_block or not title_block.strong:
             continue
-            
+
         # Parse title text which is in format: "SUBJECT NUM. Title. Units."
         title_text = clean_text(title_block.strong.text)
-        
+
         # Debug
         # print(f"Processing: {title_text}")
-        
-        # More flexible regex that handles all variations
-        match = re.match(r'([A-Z0-9&_\s]+)\s+([H]?\d+[A-Z]?(?:LA|LB|L|W|S)?)\.\s+(.*?)\.\s+(\d+(?:-\d+)?(?:\.\d+)?)\s+((?:Workload )?Units?)\.\s*', title_text)
+
+        match = TITLE_RE.match(title_text)
 
         if not match:
             print(f"Failed to match: {title_text}")
             continue
-            
-        subject, number, title, units, unit_type = match.groups()
-        subject = clean_text(subject)
-        number = clean_text(number)
-        title = clean_text(title)
-        units = clean_text(units)
+
+        # The title text is already clean, so the groups only need trimming
+        subject, number, title, units, unit_type = (group.strip() for group in match.groups())
         course_id = f"{subject} {number}"
-        
+
         # Store unit_type if needed (whether it's "Units", "Unit" or "Workload Units")
         # You can uncomment this if you want to store the unit type in your JSON
         # unit_type = clean_text(unit_type)
-        
+
         # Extract description block
         desc_block = course_block.find('div', class_='courseblockdesc')
         if not desc_block:
             continue
-            
+
         # Get all paragraph elements
         paragraphs = desc_block.find_all('p')
-        
+
         # First paragraph is always the description
         description = clean_text(paragraphs[0].text) if paragraphs else "N/A"
-        
+
         # Initialize optional fields
         prerequisites = "N/A"
         overlaps_with = "N/A"
         same_as = "N/A"
         restriction = "N/A"
         grading_option = "N/A"
-        
+
         # Process remaining paragraphs for other information
-        for p in paragraphs[1:] if len(paragraphs) > 1 else []:
+        for p in paragraphs[1:]:
             text = clean_text(p.text)
-            
+
             if text.startswith("Prerequisite"):
-                prerequisites = clean_text(text[13:])
+                prerequisites = text[13:].strip()
             elif text.startswith("Same as"):
-                same_as = clean_text(text[8:])
+                same_as = text[8:].strip()
             elif text.startswith("Restriction"):
-                restriction = clean_text(text[11:])
+                restriction = text[11:].strip()
             elif text.startswith("Grading Option"):
-                grading_option = clean_text(text[15:])
+                grading_option = text[15:].strip()
             if "Overlaps with" in text:
-                overlaps_with = clean_text(text.split("Overlaps with")[1].strip())
-        
+                overlaps_with = text.split("Overlaps with")[1].strip()
+
         # Store course information
         courses[course_id] = {
             "title": title,
@@ -96,31 +119,127 @@ def scrape_course_catalog(url):
             "restriction": restriction,
             "grading_option": grading_option
         }
-    
+
     return courses
 
-def main():
-    urls = [
-        "https://catalogue.uci.edu/allcourses/compsci/",
-        "https://catalogue.uci.edu/allcourses/i_c_sci/",
-        "https://catalogue.uci.edu/allcourses/in4matx/",
-        "https://catalogue.uci.edu/allcourses/stats/",
-        "https://catalogue.uci.edu/allcourses/math/",
-    ]
-    
+def make_session(workers=8):
+    """A requests session whose connection pool keeps one connection per worker alive."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+def fetch_department(session, url, cached=None, timeout=30, save_path=None):
+    """
+    Fetch and parse one catalog page, conditionally on the cached entry if there is one.
+
+    Returns (status, entry): entry is {"etag", "last_modified", "courses"} and is the
+    cached entry itself when the server answers 304, or None if the fetch failed. A page
+    that is downloaded is also written to save_path, if given.
+    """
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers['If-None-Match'] = cached["etag"]
+        if cached.get("last_modified"):
+            headers['If-Modified-Since'] = cached["last_modified"]
+    try:
+        response = session.get(url, headers=headers, timeout=timeout)
+    except requests.RequestException as e:
+        print(f"Failed to retrieve data from {url}: {e}")
+        return None, None
+    if response.status_code == 304 and cached:
+        return 304, cached
+    if response.status_code != 200:
+        print(f"Failed to retrieve data from {url}")
+        return response.status_code, None
+    if save_path:
+        with open(save_path, 'w', encoding='utf-8') as f:
+            f.write(response.text)
+    return 200, {
+        "etag": response.headers.get('ETag'),
+        "last_modified": response.headers.get('Last-Modified'),
+        "courses": parse_course_catalog(response.text),
+    }
+
+def scrape_course_catalog(url):
+    """Scrape course information from a UCI catalog page."""
+    with make_session(1) as session:
+        status, entry = fetch_department(session, url)
+    return entry["courses"] if entry else {}
+
+def load_page_cache(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except json.JSONDecodeError:
+        print(f"Warning: {path} contains invalid JSON, every page will be fetched")
+        return {}
+
+def save_page_cache(path, cache):
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(cache, f)
+    os.replace(tmp, path)
+
+def scrape_departments(departments, base_url=BASE_URL, workers=8, cache=None, save_dir=None):
+    """
+    Scrape every department's catalog page concurrently; courses come back in department
+    order. cache (url -> entry, updated in place) makes the requests conditional, and
+    save_dir keeps each downloaded page as <department>.html (for catalog_fixture_server.py).
+    """
+    cache = {} if cache is None else cache
+    urls = [department_url(department, base_url) for department in departments]
+    if save_dir:
+        os.makedirs(save_dir, exist_ok=True)
+
+    def fetch(department, url):
+        save_path = os.path.join(save_dir, f"{department}.html") if save_dir else None
+        return fetch_department(session, url, cache.get(url), save_path=save_path)
+
+    with make_session(workers) as session, ThreadPoolExecutor(max(1, workers)) as pool:
+        results = list(pool.map(fetch, departments, urls))
+
     all_courses = {}
-    
-    for url in urls:
-        print(f"Scraping {url}")
-        courses = scrape_course_catalog(url)
-        all_courses.update(courses)
-        print(f"Found {len(courses)} courses")
-    
+    for url, (status, entry) in zip(urls, results):
+        if entry is None:
+            continue
+        cache[url] = entry
+        all_courses.update(entry["courses"])
+        note = " (not modified)" if status == 304 else ""
+        print(f"Scraped {url}: {len(entry['courses'])} courses{note}")
+    unchanged = sum(1 for status, entry in results if status == 304)
+    failed = sum(1 for status, entry in results if entry is None)
+    print(f"{len(urls)} pages: {len(urls) - unchanged - failed} fetched, {unchanged} not modified, {failed} failed (parser: {PARSER})")
+    return all_courses
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape UCI catalog pages into course data")
+    parser.add_argument("--departments", nargs="+", default=DEPARTMENTS, help="Catalog slugs, e.g. compsci i_c_sci")
+    parser.add_argument("--base-url", default=BASE_URL, help="Catalog site to scrape (e.g. catalog_fixture_server.py)")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent page fetches")
+    parser.add_argument("--output", default="course_data.json")
+    parser.add_argument("--cache", default="scrape_cache.json", help="ETag / Last-Modified cache of scraped pages")
+    parser.add_argument("--no-cache", action="store_true", help="Fetch every page unconditionally")
+    parser.add_argument("--save-pages", default=None, metavar="DIR", help="Also save each page as DIR/<department>.html")
+    args = parser.parse_args()
+
+    # Saving needs every page's body, so it never sends conditional requests
+    cache = {} if args.no_cache or args.save_pages else load_page_cache(args.cache)
+    start_time = time.time()
+    all_courses = scrape_departments(args.departments, args.base_url, args.workers, cache, args.save_pages)
+    print(f"Scraped in {time.time() - start_time:.2f}s")
+    if not args.no_cache:
+        save_page_cache(args.cache, cache)
+
     # Save to JSON file
-    output_path = "course_data.json"
+    output_path = args.output
     with open(output_path, 'w', encoding='utf-8') as f:
         json.dump(all_courses, f, indent=4)
-    
+
     print(f"Saved {len(all_courses)} courses to {output_path}")
 
 if __name__ == "__main__":
@@ -0,0 +1,193 @@
+import json
+import os
+import sys
+import tracemalloc
+from collections.abc import Mapping
+
+# The closure index lives with the planner code in src/
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from src.closure import ClosureIndex
+
+# Sidecar format version, bumped whenever the line layout changes
+SIDECAR_VERSION = 1
+
+
+class CourseStore(Mapping):
+    """
+    Read-only, partially loaded view of course_data_with_logical_prereqs.json.
+
+    On first use a compact JSON-lines sidecar is written next to the JSON file. It holds
+    one line per course: the byte offset and length of that course's record in the JSON,
+    its title and its parsed prerequisites as compact JSON text. Later runs read only the
+    sidecar, so the long description and restriction text is never parsed or held in
+    memory, and a course's prerequisite structure is only decoded when asked for. The
+    sidecar is rebuilt whenever the JSON file's size or modification time changes.
+
+    store[course_id] returns {"title", "parsed_prerequisites"}, store.record(course_id)
+    the full record read straight from its offset.
+    """
+
+    def __init__(self, json_file="course_data_with_logical_prereqs.json", sidecar_file=None):
+        self.json_file = json_file
+        self.sidecar_file = sidecar_file or json_file + ".index.jsonl"
+        self._index = {}
+        self._closure = None
+        self._load()
+
+    def _source_stamp(self):
+        stat = os.stat(self.json_file)
+        return {
+            "version": SIDECAR_VERSION,
+            "source": os.path.basename(self.json_file),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns
+        }
+
+    def _load(self):
+        """Read the sidecar, rebuilding it first if it is missing or stale."""
+        stamp = self._source_stamp()
+        try:
+            with open(self.sidecar_file, "r", encoding="utf-8") as f:
+                if json.loads(f.readline()) == stamp:
+                    for line in f:
+                        course_id, offset, length, title, prereqs = json.loads(line)
+                        self._index[course_id] = (offset, length, title, prereqs)
+                    return
+        except (OSError, ValueError):
+            pass
+        self._index = {}
+        self._build(stamp)
+
+    def _build(self, stamp):
+        """
+        Walk the top-level JSON object once with raw_decode, recording where each
+        course record starts and ends in bytes, and write the sidecar.
+        """
+        with open(self.json_file, "rb") as f:
+            raw = f.read()
+        text = raw.decode("utf-8")
+        decoder = json.JSONDecoder()
+
+        def skip(pos, chars=" \t\r\n"):
+            while pos < len(text) and text[pos] in chars:
+                pos += 1
+            return pos
+
+        # Track byte offsets alongside character offsets, since the text is UTF-8
+        pos = skip(0)
+        if text[pos] != "{":
+            raise ValueError(f"{self.json_file} is not a JSON object of courses")
+        pos = skip(pos + 1)
+        byte_pos, last = 0, 0
+
+        while pos < len(text) and text[pos] != "}":
+            course_id, pos = decoder.raw_decode(text, pos)
+            pos = skip(skip(pos), ":")
+            pos = skip(pos)
+            start = pos
+            record, pos = decoder.raw_decode(text, pos)
+
+            byte_pos += len(text[last:start].encode("utf-8"))
+            length = len(text[start:pos].encode("utf-8"))
+            prereqs = json.dumps(record.get("parsed_prerequisites"), separators=(",", ":"), ensure_ascii=False)
+            self._index[course_id] = (byte_pos, length, record.get("title", ""), prereqs)
+            byte_pos, last = byte_pos + length, pos
+
+            pos = skip(skip(pos), ",")
+            pos = skip(pos)
+
+        # Write to a temporary file first so a crash never leaves a half-written sidecar
+        tmp = self.sidecar_file + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(json.dumps(stamp) + "\n")
+            for course_id, entry in self._index.items():
+                f.write(json.dumps([course_id, *entry], ensure_ascii=False) + "\n")
+        os.replace(tmp, self.sidecar_file)
+
+    def __getitem__(self, course_id):
+        _, _, title, prereqs = self._index[course_id]
+        return {"title": title, "parsed_prerequisites": json.loads(prereqs)}
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, course_id):
+        return course_id in self._index
+
+    def prerequisites(self, course_id, default="N/A"):
+        """The parsed prerequisite structure of one course, or default if unknown."""
+        entry = self._index.get(course_id)
+        prereqs = None if entry is None else json.loads(entry[3])
+        return default if prereqs is None else prereqs
+
+    def prerequisite_courses(self, course_id):
+        """Every course named in a course's parsed prerequisites (AND and OR alike), itself excluded."""
+        courses = []
+        stack = [self.prerequisites(course_id)]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, dict):
+                for members in node.values():
+                    stack.extend(reversed(members))
+            elif isinstance(node, str) and node != "N/A" and node != course_id:
+                courses.append(node)
+        return courses
+
+    def closure(self):
+        """
+        Ancestor/descendant closure index over every course, built on first use.
+
+        Answers "what does a course ultimately require / unlock" and depth-bounded
+        versions of those from precomputed bitsets and distances, without walking
+        the prerequisite graph again.
+        """
+        if self._closure is None:
+            self._closure = ClosureIndex.from_adjacency({c: self.prerequisite_courses(c) for c in self._index})
+        return self._closure
+
+    def record(self, course_id):
+        """Full course record, read and parsed from its byte range in the JSON file."""
+        offset, length, _, _ = self._index[course_id]
+        with open(self.json_file, "rb") as f:
+            f.seek(offset)
+            return json.loads(f.read(length).decode("utf-8"))
+
+
+def resident_memory_mb():
+    """Current resident set size in MB (Linux /proc), falling back to peak RSS."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS, kilobytes elsewhere
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def compare_footprint(json_file="course_data_with_logical_prereqs.json"):
+    """Print the memory held by a full json.load against a CourseStore of the same file."""
+    CourseStore(json_file)  # make sure the sidecar exists, so only loading is measured
+
+    tracemalloc.start()
+    with open(json_file, "r", encoding="utf-8") as f:
+        courses = json.load(f)
+    full, _ = tracemalloc.get_traced_memory()
+    del courses
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    store = CourseStore(json_file)
+    indexed, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"json.load:   {full / 2**20:.2f} MB held for {len(store)} courses")
+    print(f"CourseStore: {indexed / 2**20:.2f} MB held ({full / max(indexed, 1):.1f}x less)")
+    print(f"Process RSS: {resident_memory_mb():.1f} MB")
+
+
+if __name__ == "__main__":
+    compare_footprint(*sys.argv[1:])
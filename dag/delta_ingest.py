@@ -0,0 +1,111 @@
+"""
+Content-hash delta ingestion for the catalog pipeline.
+
+Each course's raw prerequisite text is normalised (whitespace collapsed) and hashed. A
+fresh scrape is diffed against the previous course_data_with_logical_prereqs.json so that
+only courses whose prerequisite text is new or changed go back through the LLM parser;
+every other course keeps its previous parsed_prerequisites.
+
+The hash of the text a parse came from is stored with it as "prerequisites_hash". A
+parse whose API call failed stores null instead, so that course is picked up again on the
+next run. Outputs written before this field existed are diffed by hashing their stored
+prerequisite text instead.
+
+Run directly to preview what a refresh would re-parse:
+    python delta_ingest.py [course_data.json] [course_data_with_logical_prereqs.json]
+"""
+import hashlib
+import json
+import re
+import sys
+
+HASH_FIELD = "prerequisites_hash"
+
+
+def normalize_prereq_text(text):
+    """Collapse whitespace so formatting-only changes in a scrape do not count as changes."""
+    if not isinstance(text, str) or not text.strip():
+        return "N/A"
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def prereq_hash(text):
+    """Stable hash of a course's normalised prerequisite text."""
+    return hashlib.sha256(normalize_prereq_text(text).encode("utf-8")).hexdigest()
+
+
+def previous_hash(record):
+    """Hash the previous parse was made from, or None if it has no usable parse."""
+    if "parsed_prerequisites" not in record:
+        return None
+    if HASH_FIELD in record:
+        return record[HASH_FIELD]
+    return prereq_hash(record.get("prerequisites"))
+
+
+def load_previous(output_file):
+    """Previous parsed output keyed by course id, empty if there is none to reuse."""
+    try:
+        with open(output_file, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+        print(f"Loaded {len(previous)} previously parsed courses from {output_file}")
+        return previous
+    except FileNotFoundError:
+        print(f"No previous output at {output_file}, every course will be parsed")
+    except json.JSONDecodeError:
+        print(f"Warning: {output_file} contains invalid JSON, every course will be parsed")
+    return {}
+
+
+def diff_courses(courses, previous):
+    """
+    Sort the scraped courses by how their prerequisite text compares to the previous run.
+
+    Returns {"new", "changed", "unchanged", "removed"}, each a list of course ids; the
+    first three follow the order of courses, "removed" the order of previous. A course
+    whose previous parse failed counts as changed.
+    """
+    delta = {"new": [], "changed": [], "unchanged": [], "removed": []}
+    for course_id, course_data in courses.items():
+        record = previous.get(course_id)
+        if record is None:
+            delta["new"].append(course_id)
+        elif previous_hash(record) == prereq_hash(course_data.get("prerequisites")):
+            delta["unchanged"].append(course_id)
+        else:
+            delta["changed"].append(course_id)
+    delta["removed"] = [course_id for course_id in previous if course_id not in courses]
+    return delta
+
+
+def reuse_unchanged(courses, previous, delta):
+    """Copy the previous parse (and its hash) onto every unchanged course, in place."""
+    for course_id in delta["unchanged"]:
+        courses[course_id]["parsed_prerequisites"] = previous[course_id]["parsed_prerequisites"]
+        courses[course_id][HASH_FIELD] = previous_hash(previous[course_id])
+
+
+def print_delta(delta):
+    print(f"Delta: {len(delta['new'])} new, {len(delta['changed'])} changed, "
+          f"{len(delta['unchanged'])} unchanged, {len(delta['removed'])} removed")
+    for kind in ("new", "changed", "removed"):
+        if delta[kind]:
+            shown = ", ".join(delta[kind][:10])
+            more = f" (+{len(delta[kind]) - 10} more)" if len(delta[kind]) > 10 else ""
+            print(f"  {kind}: {shown}{more}")
+
+
+def main():
+    input_file = sys.argv[1] if len(sys.argv) > 1 else "course_data.json"
+    output_file = sys.argv[2] if len(sys.argv) > 2 else "course_data_with_logical_prereqs.json"
+    try:
+        with open(input_file, "r", encoding="utf-8") as f:
+            courses = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"Error: could not read {input_file}: {e}")
+        return
+    print_delta(diff_courses(courses, load_previous(output_file)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Local stand-in for an LLM endpoint, for exercising llm_pipeline.py without an API key.
+
+POST / with {"prompt": "..."} is answered with {"text": "<parsed JSON>"} after an injected
+delay. A chosen fraction of requests get HTTP 429 with a Retry-After header instead. The
+"parse" is a deterministic regex pass over the prerequisite text, so a run's results can be
+checked against fake_parse() directly.
+
+    python fake_llm_server.py [--port 8765] [--latency 0.2] [--jitter 0.1] [--rate-limit 0.1]
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Runs of upper-case words followed by a course number, e.g. "I&C SCI 31", "MATH 2B"
+COURSE_RE = re.compile(r"[A-Z&]+(?: [A-Z&]+)* \d+[A-Z]*")
+TEXT_MARKER = "Prerequisite Text:"
+
+
+def fake_parse(text):
+    """The structure the fake server returns for one prerequisite text."""
+    codes = list(dict.fromkeys(COURSE_RE.findall(text)))
+    if not codes:
+        return "N/A"
+    if len(codes) == 1:
+        return codes[0]
+    return {"or" if " or " in text and " and " not in text else "and": codes}
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get("Content-Length", 0))
+        prompt = json.loads(self.rfile.read(length) or b"{}").get("prompt", "")
+
+        with server.lock:
+            server.requests += 1
+            limited = server.rng.random() < server.rate_limit
+            delay = server.latency + server.rng.uniform(0, server.jitter)
+            if limited:
+                server.rejected += 1
+        time.sleep(delay)
+
+        if limited:
+            body = json.dumps({"error": "rate limited"}).encode("utf-8")
+            self.send_response(429)
+            self.send_header("Retry-After", f"{server.retry_after:g}")
+        else:
+            text = prompt.rsplit(TEXT_MARKER, 1)[-1].strip()
+            body = json.dumps({"text": json.dumps(fake_parse(text))}).encode("utf-8")
+            self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(port=0, latency=0.2, jitter=0.1, rate_limit=0.1, retry_after=0.5, seed=0):
+    """Bind the fake server (port 0 picks a free one) without starting it."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeLLMHandler)
+    server.daemon_threads = True
+    server.latency, server.jitter = latency, jitter
+    server.rate_limit, server.retry_after = rate_limit, retry_after
+    server.rng = random.Random(seed)
+    server.lock = threading.Lock()
+    server.requests = server.rejected = 0
+    return server
+
+
+def serve_in_thread(**options):
+    """Start a fake server on a background thread; returns (server, url). Stop with server.shutdown()."""
+    server = make_server(**options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    return server, f"http://{host}:{port}/"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake LLM endpoint with injected latency and 429s")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="Base seconds per response")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Extra random seconds per response")
+    parser.add_argument("--rate-limit", type=float, default=0.1, help="Fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=0.5, help="Retry-After seconds sent with a 429")
+    args = parser.parse_args()
+
+    server = make_server(args.port, args.latency, args.jitter, args.rate_limit, args.retry_after)
+    print(f"Fake LLM server listening on http://127.0.0.1:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\nServed {server.requests} requests ({server.rejected} rate limited)")
+
+
+if __name__ == "__main__":
+    main()
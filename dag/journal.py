@@ -0,0 +1,122 @@
+"""
+Append-only journal for the prerequisite conversion job.
+
+Each course's parse is appended to <output>.journal.jsonl as one
+{"id", "parsed", "hash"} line as soon as it is made, instead of rewriting the whole
+dataset every few courses. Lines are flushed to disk with fsync in batches, so a crash
+loses at most the last batch; a torn last line is handled as in jsonl.py. A resumed run
+(convert_logical.py --resume) takes every journaled course whose prerequisite text is
+unchanged and whose parse succeeded, and only parses the rest.
+compact() then writes the finished dataset to the output file through a temporary file
+and a rename, and removes the journal.
+
+    python journal.py [course_data.json] [course_data_with_logical_prereqs.json]   # resume preview
+"""
+import json
+import os
+import sys
+
+from delta_ingest import HASH_FIELD, prereq_hash
+from jsonl import open_for_append, read_entries
+
+
+def journal_path(output_file):
+    return f"{output_file}.journal.jsonl"
+
+
+def read_journal(path):
+    """Latest journaled record per course id, and the number of unreadable lines skipped."""
+    return read_entries(path, lambda record: record["id"])
+
+
+def resumable(records, courses):
+    """Ids of journaled courses whose parse succeeded and whose text has not changed since."""
+    return [
+        course_id for course_id, record in records.items()
+        if course_id in courses and record.get("hash") is not None
+        and record["hash"] == prereq_hash(courses[course_id].get("prerequisites"))
+    ]
+
+
+class ConversionJournal:
+    """
+    Writer for one run's journal. With resume=False any existing journal is discarded;
+    with resume=True its records are loaded into self.records and appended to. fsyncs
+    every batch_size records and on close(); use as a context manager.
+    """
+
+    def __init__(self, output_file, resume=False, batch_size=25):
+        self.output_file = output_file
+        self.path = journal_path(output_file)
+        self.batch_size = batch_size
+        self.records, self.skipped_lines = read_journal(self.path) if resume else ({}, 0)
+        self.written = self.unsynced = 0
+        self._file = open_for_append(self.path) if resume else open(self.path, "w", encoding="utf-8")
+
+    def record(self, course_id, parsed, text_hash):
+        """Append one course's parse; text_hash is None for a failed call."""
+        record = {"id": course_id, "parsed": parsed, "hash": text_hash}
+        self.records[course_id] = record
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.written += 1
+        self.unsynced += 1
+        if self.unsynced >= self.batch_size:
+            self.sync()
+
+    def sync(self):
+        if self._file is not None and self.unsynced:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.unsynced = 0
+
+    def close(self):
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def apply(self, json_data, course_ids):
+        """Copy the journaled parse (and its hash) of each of course_ids onto json_data, in place."""
+        for course_id in course_ids:
+            json_data[course_id]["parsed_prerequisites"] = self.records[course_id]["parsed"]
+            json_data[course_id][HASH_FIELD] = self.records[course_id]["hash"]
+
+    def compact(self, json_data):
+        """Write the finished json_data to the output file atomically, then drop the journal."""
+        self.close()
+        tmp = f"{self.output_file}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(json_data, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.output_file)
+        os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    input_file = sys.argv[1] if len(sys.argv) > 1 else "course_data.json"
+    output_file = sys.argv[2] if len(sys.argv) > 2 else "course_data_with_logical_prereqs.json"
+    try:
+        with open(input_file, "r", encoding="utf-8") as f:
+            courses = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"Error: could not read {input_file}: {e}")
+        return
+    path = journal_path(output_file)
+    if not os.path.exists(path):
+        print(f"No journal at {path}, nothing to resume")
+        return
+    records, skipped = read_journal(path)
+    reusable = resumable(records, courses)
+    print(f"{path}: {len(records)} journaled courses ({skipped} unreadable lines)")
+    print(f"A --resume run would reuse {len(reusable)} of {len(courses)} courses")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Append-only JSON-lines files that survive being interrupted mid-write.
+
+Shared by the parse cache (parse_cache.py) and the conversion journal (journal.py).
+An entry is appended as one line, so a crash can at worst leave a torn last line: it
+is skipped when the file is read back, and the next writer first ends it with a
+newline so that its own entries start on a line of their own.
+"""
+import json
+import os
+
+
+def read_entries(path, key):
+    """
+    {key(entry): entry} over the file's lines, later lines winning, and the number of
+    lines skipped as unreadable: a torn write, or a line key() cannot handle. A missing
+    file reads as empty.
+    """
+    entries, skipped = {}, 0
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    entries[key(entry)] = entry
+                except (ValueError, KeyError, TypeError):
+                    skipped += 1
+    except FileNotFoundError:
+        pass
+    return entries, skipped
+
+
+def open_for_append(path):
+    """Open path for appending entries, first ending a torn last line if it has one."""
+    f = open(path, "a", encoding="utf-8")
+    if f.tell() and not _ends_with_newline(path):
+        f.write("\n")
+    return f
+
+
+def _ends_with_newline(path):
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
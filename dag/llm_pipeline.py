@@ -0,0 +1,269 @@
+"""
+Concurrent LLM prerequisite parsing.
+
+Prerequisite texts are handed to a pool of asyncio workers that share two rate limiters,
+one for requests per minute and one for (estimated) tokens per minute. The pipeline then
+runs as fast as the provider's limits allow instead of making one blocking call at a time.
+Rate-limit (429) and other failed calls are retried with jittered exponential backoff, and
+results come back in input order however the calls finish.
+
+The model client is a pluggable backend with one coroutine, generate(prompt) -> text:
+GeminiBackend wraps a google.generativeai model, HTTPBackend any JSON endpoint such as
+fake_llm_server.py. The whole pipeline can be run locally against the fake server, with
+injected latency and 429s:
+
+    python llm_pipeline.py [--latency 0.2] [--rate-limit 0.1] [--workers 16] [--rpm 600]
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Rough allowance for the model's reply when budgeting tokens per minute
+REPLY_TOKENS = 64
+
+
+def interpret_response(result_text):
+    """Turn the model's raw reply into a parsed prerequisite structure (or "N/A")."""
+    result_text = result_text.strip()
+
+    # If the response is just "N/A" (with or without quotes), return "N/A"
+    if result_text in ['"N/A"', "'N/A'", "N/A"]:
+        return "N/A"
+
+    # Clean up any markdown code block formatting
+    cleaned_text = re.sub(r'^```(?:json)?\s*', '', result_text)
+    cleaned_text = re.sub(r'\s*```$', '', cleaned_text)
+
+    # Parse as JSON, otherwise keep the cleaned text as is
+    try:
+        return json.loads(cleaned_text)
+    except json.JSONDecodeError:
+        return cleaned_text
+
+
+def estimate_tokens(text):
+    """Rough token count (about four characters a token) of a prompt plus its reply."""
+    return len(text) // 4 + REPLY_TOKENS
+
+
+def has_prereqs(text):
+    return bool(text) and text != "N/A"
+
+
+class RateLimitError(Exception):
+    """The backend was told to slow down (HTTP 429 / quota exhausted)."""
+
+    def __init__(self, message="rate limited", retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """
+    Allows at most per_minute units (requests or tokens) in any rolling 60 s window.
+    acquire(n) waits until the units taken in the last 60 s plus n fit, then takes them;
+    waiters are served first come, first served. Unlike a token bucket that starts full
+    and refills on top, no window ever sees more than a minute's worth.
+    """
+
+    window = 60.0
+
+    def __init__(self, per_minute):
+        self.per_minute = per_minute
+        self.taken = deque()  # (monotonic time, units), oldest first
+        self.used = 0
+        self._lock = None
+
+    def _expire(self, now):
+        while self.taken and self.taken[0][0] + self.window <= now:
+            self.used -= self.taken.popleft()[1]
+
+    async def acquire(self, amount=1):
+        # A request larger than a whole minute's worth waits for an empty window and goes alone
+        amount = min(amount, self.per_minute)
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            while self.used + amount > self.per_minute:
+                # Sleep until enough of the oldest grants have left the window
+                excess = self.used + amount - self.per_minute
+                for granted, units in self.taken:
+                    excess -= units
+                    if excess <= 0:
+                        break
+                await asyncio.sleep(max(0.0, granted + self.window - now))
+                now = time.monotonic()
+                self._expire(now)
+            self.taken.append((now, amount))
+            self.used += amount
+
+
+class GeminiBackend:
+    """A google.generativeai model, called on a worker thread since its client blocks."""
+
+    def __init__(self, model):
+        import google.generativeai as genai
+        self.model = model
+        self.config = genai.types.GenerationConfig(temperature=0.0)
+
+    async def generate(self, prompt):
+        try:
+            response = await asyncio.to_thread(
+                self.model.generate_content, prompt, generation_config=self.config, stream=False
+            )
+        except Exception as e:
+            # google.api_core raises ResourceExhausted (HTTP 429) when over quota
+            if type(e).__name__ in ("ResourceExhausted", "TooManyRequests") or "429" in str(e):
+                raise RateLimitError(str(e)) from e
+            raise
+        return response.text
+
+
+class HTTPBackend:
+    """POSTs {"prompt"} as JSON to url and reads {"text"} back; 429 honours Retry-After."""
+
+    def __init__(self, url, timeout=60):
+        self.url = url
+        self.timeout = timeout
+
+    def _post(self, prompt):
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps({"prompt": prompt}).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())["text"]
+        except urllib.error.HTTPError as e:
+            if e.code == 429:
+                retry_after = e.headers.get("Retry-After")
+                raise RateLimitError(f"HTTP 429 from {self.url}", float(retry_after) if retry_after else None)
+            raise
+
+    async def generate(self, prompt):
+        return await asyncio.to_thread(self._post, prompt)
+
+
+async def parse_all(backend, prompt_template, texts, workers=8, requests_per_minute=15,
+                    tokens_per_minute=1_000_000, max_retries=5, base_delay=1.0, max_delay=60.0,
+                    on_result=None):
+    """
+    Parse every prerequisite text with backend, with at most workers calls in flight.
+
+    Returns [(parsed, ok)] in the order of texts, where ok is False if the call still
+    failed after max_retries retries (parsed is then "N/A"). on_result(index, parsed, ok)
+    is called in that same order as soon as each result and all before it are in. Texts
+    with nothing to parse ("N/A" or empty) never reach the backend.
+    """
+    request_limiter = RateLimiter(requests_per_minute)
+    token_limiter = RateLimiter(tokens_per_minute)
+    results = [None] * len(texts)
+    pending = iter(range(len(texts)))
+    stats = {"calls": 0, "rate_limited": 0, "retries": 0, "failed": 0}
+    emitted = 0
+
+    def emit():
+        # Hand results on in input order, holding back any that finished early
+        nonlocal emitted
+        while emitted < len(results) and results[emitted] is not None:
+            if on_result:
+                on_result(emitted, *results[emitted])
+            emitted += 1
+
+    async def call(text):
+        prompt = f"{prompt_template}\n\nPrerequisite Text: {text}"
+        for attempt in range(max_retries + 1):
+            await request_limiter.acquire()
+            await token_limiter.acquire(estimate_tokens(prompt))
+            stats["calls"] += 1
+            retry_after = None
+            try:
+                return interpret_response(await backend.generate(prompt)), True
+            except RateLimitError as e:
+                stats["rate_limited"] += 1
+                retry_after = e.retry_after
+                error = e
+            except Exception as e:
+                error = e
+            if attempt == max_retries:
+                break
+            # Full-jitter exponential backoff, never sooner than the server asked for
+            stats["retries"] += 1
+            backoff = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+            await asyncio.sleep(max(backoff, retry_after or 0))
+        stats["failed"] += 1
+        print(f"  Giving up on {text[:60]!r} after {max_retries + 1} attempts: {error}")
+        return "N/A", False
+
+    async def worker():
+        for i in pending:
+            results[i] = await call(texts[i]) if has_prereqs(texts[i]) else ("N/A", True)
+            emit()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, min(workers, len(texts))))))
+    elapsed = time.perf_counter() - start
+    print(f"Parsed {len(texts)} texts in {elapsed:.2f}s: {stats['calls']} calls, "
+          f"{stats['rate_limited']} rate limited, {stats['retries']} retries, {stats['failed']} failed")
+    return results
+
+
+def parse_texts(backend, prompt_template, texts, workers=8, **options):
+    """Synchronous entry point to parse_all."""
+    async def run():
+        # Blocking backends run on the loop's default executor, which is otherwise
+        # sized by CPU count rather than by how many calls should be in flight
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(workers))
+        return await parse_all(backend, prompt_template, texts, workers=workers, **options)
+    return asyncio.run(run())
+
+
+def main():
+    from fake_llm_server import fake_parse, serve_in_thread
+
+    parser = argparse.ArgumentParser(description="Run the parsing pipeline against a local fake LLM server")
+    parser.add_argument("--input", default="course_data.json")
+    parser.add_argument("--limit", type=int, default=None, help="Only parse the first N courses")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--rpm", type=float, default=600, help="Requests per minute")
+    parser.add_argument("--tpm", type=float, default=1_000_000, help="Tokens per minute")
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--rate-limit", type=float, default=0.1, help="Fraction of requests answered with 429")
+    args = parser.parse_args()
+
+    with open(args.input, "r", encoding="utf-8") as f:
+        courses = json.load(f)
+    texts = [course.get("prerequisites", "N/A") for course in courses.values()][:args.limit]
+
+    server, url = serve_in_thread(latency=args.latency, jitter=args.jitter, rate_limit=args.rate_limit, retry_after=0.5)
+    order = []
+    try:
+        results = parse_texts(
+            HTTPBackend(url), "Parse these prerequisites.", texts,
+            workers=args.workers, requests_per_minute=args.rpm, tokens_per_minute=args.tpm,
+            base_delay=0.2, on_result=lambda i, parsed, ok: order.append(i)
+        )
+    finally:
+        server.shutdown()
+
+    wrong = sum(1 for text, (parsed, ok) in zip(texts, results) if ok and parsed != (fake_parse(text) if has_prereqs(text) else "N/A"))
+    in_order = order == list(range(len(texts)))
+    sequential = sum(1 for text in texts if has_prereqs(text)) * (args.latency + args.jitter / 2)
+    print(f"Server saw {server.requests} requests ({server.rejected} answered 429)")
+    print(f"Results: {len(results)}, mismatched: {wrong}, delivered in order: {in_order}")
+    print(f"One call at a time would take about {sequential:.1f}s at this latency")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Persistent cache of parsed prerequisite expressions.
+
+Maps normalised prerequisite text (see delta_ingest.normalize_prereq_text) to the
+structure the LLM parsed it into, so text shared by several courses, or seen on an
+earlier run, is only ever sent to the model once.
+
+The cache is an append-only JSON-lines file with one {"ns", "text", "parsed"} entry per
+line. Each entry is written with a single append and flushed to disk, so a crash can at
+worst leave a torn last line (see jsonl.py); compact() rewrites the file through a
+temporary file and a rename. Entries are namespaced by a hash of the prompt, so changing
+the prompt starts a fresh namespace instead of reusing parses made under the old rules.
+
+    python parse_cache.py [prereq_parse_cache.jsonl]    # print size and compact
+"""
+import hashlib
+import json
+import os
+import sys
+
+from delta_ingest import normalize_prereq_text
+from jsonl import open_for_append, read_entries
+
+
+def prompt_namespace(prompt_template):
+    """Short hash identifying the prompt a parse was made with."""
+    return hashlib.sha256(prompt_template.encode("utf-8")).hexdigest()[:12]
+
+
+def _entry_key(entry):
+    return entry["ns"], entry["text"]
+
+
+class ParseCache:
+    """
+    Normalised prerequisite text -> parsed structure for one prompt namespace, persisted
+    to an append-only JSONL file. Use as a context manager, or call close() when done.
+    """
+
+    def __init__(self, path="prereq_parse_cache.jsonl", namespace=""):
+        self.path = path
+        self.namespace = namespace
+        self.entries = {}
+        self.hits = self.misses = self.stored = self.skipped_lines = 0
+        self._load()
+        self._file = None
+
+    def _load(self):
+        latest, self.skipped_lines = read_entries(self.path, _entry_key)
+        for (namespace, text), entry in latest.items():
+            if namespace == self.namespace:
+                self.entries[text] = entry.get("parsed")
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, text):
+        return normalize_prereq_text(text) in self.entries
+
+    def get(self, text):
+        """The cached parse of text, or None on a miss; counted towards the hit rate."""
+        parsed = self.entries.get(normalize_prereq_text(text))
+        if parsed is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return parsed
+
+    def put(self, text, parsed):
+        """Record a successful parse and append it to the file straight away."""
+        key = normalize_prereq_text(text)
+        if self.entries.get(key) == parsed:
+            return
+        self.entries[key] = parsed
+        line = json.dumps({"ns": self.namespace, "text": key, "parsed": parsed}, ensure_ascii=False)
+        if self._file is None:
+            self._file = open_for_append(self.path)
+        self._file.write(line + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.stored += 1
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def compact(self):
+        """Rewrite the file with one line per entry (all namespaces kept), atomically."""
+        self.close()
+        if not os.path.exists(self.path):
+            return
+        latest, _ = read_entries(self.path, _entry_key)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for entry in latest.values():
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else "prereq_parse_cache.jsonl"
+    if not os.path.exists(path):
+        print(f"No cache at {path}")
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        lines = sum(1 for _ in f)
+    cache = ParseCache(path)
+    cache.compact()
+    with open(path, "r", encoding="utf-8") as f:
+        kept = sum(1 for _ in f)
+    print(f"{path}: compacted {lines} lines to {kept} entries ({cache.skipped_lines} unreadable lines dropped)")
+
+
+if __name__ == "__main__":
+    main()
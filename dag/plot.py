@@ -1,9 +1,9 @@
-import json
 import networkx as nx
 import matplotlib.pyplot as plt
 from matplotlib.patches import Polygon
 import numpy as np
 import os
+from course_store import CourseStore
 
 class CourseDAGVisualizer:
     def __init__(self, json_file='course_data_with_logical_prereqs.json'):
@@ -15,10 +15,9 @@ class CourseDAGVisualizer:
         self.processed_courses = set()
         
     def load_course_data(self, json_file):
-        """Load course data from JSON file."""
+        """Open the indexed course store for the JSON file (only prerequisites stay in memory)."""
         try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return CourseStore(json_file)
         except Exception as e:
             print(f"Error loading course data: {e}")
             return {}
@@ -41,7 +40,11 @@ class CourseDAGVisualizer:
         # Add the target course as the root node
         self.G.add_node(target_course)
         
-        # Start the recursive process
+        # Report prerequisite cycles before walking them
+        for cycle in self.find_cycles(target_course):
+            print(f"Warning: Prerequisite cycle detected: {' -> '.join(cycle + [cycle[0]])}")
+        
+        # Walk the prerequisite chain
         self._add_course_prerequisites(target_course, current_depth=0, max_depth=max_depth)
         
         # Return True if we found any prerequisites
@@ -49,41 +52,112 @@ class CourseDAGVisualizer:
     
     def _add_course_prerequisites(self, course_id, current_depth=0, max_depth=10):
         """
-        Recursively add prerequisites for a course to the graph.
+        Add prerequisites for a course, and their prerequisites, to the graph.
+        
+        Uses an explicit stack instead of recursion so long prerequisite chains
+        cannot hit Python's recursion limit. Courses are visited in the same
+        depth-first order as a recursive walk.
         
         Args:
             course_id: Course ID to add prerequisites for
-            current_depth: Current recursion depth
-            max_depth: Maximum recursion depth to prevent infinite loops
+            current_depth: Depth of course_id in the tree
+            max_depth: Maximum depth to walk
         """
-        # Prevent infinite recursion or excessive depth
-        if current_depth > max_depth or course_id in self.processed_courses:
-            return
+        # Each entry is (course, depth, remaining prereq nodes); None means the
+        # course has not been expanded yet
+        stack = [(course_id, current_depth, None)]
         
-        self.processed_courses.add(course_id)
-        
-        # Skip if course doesn't exist in the data
+        while stack:
+            course, depth, pending = stack.pop()
+            
+            if pending is None:
+                # Stop at excessive depth or courses already walked (this also breaks cycles)
+                if depth > max_depth or course in self.processed_courses:
+                    continue
+                
+                self.processed_courses.add(course)
+                
+                # Skip if course doesn't exist in the data
+                if course not in self.courses:
+                    print(f"Warning: Course {course} not found in the data.")
+                    continue
+                
+                # Get the prerequisites structure for this course
+                prereq_structure = self.courses.prerequisites(course)
+                
+                # If no prerequisites, we're done with this branch
+                if prereq_structure == "N/A" or not prereq_structure:
+                    continue
+                
+                # Parse the prerequisites structure
+                pending = iter(self._parse_prerequisites(prereq_structure, course))
+            
+            # Add the edge from the next prerequisite to the current course
+            prereq_node = next(pending, None)
+            if prereq_node is None:
+                continue
+            self.G.add_edge(prereq_node, course)
+            stack.append((course, depth, pending))
+            
+            # If this is a real course (not an OR group), walk its prerequisites next
+            if not prereq_node.startswith("OR_GROUP_"):
+                stack.append((prereq_node, depth + 1, None))
+    
+    def _prereq_courses(self, course_id):
+        """Return every course named in a course's parsed prerequisites."""
         if course_id not in self.courses:
-            print(f"Warning: Course {course_id} not found in the data.")
-            return
+            return []
+        return self.courses.prerequisite_courses(course_id)
+    
+    def find_cycles(self, target_course):
+        """
+        Find prerequisite cycles reachable from the target course.
         
-        # Get the prerequisites structure for this course
-        prereq_structure = self.courses[course_id].get("parsed_prerequisites", "N/A")
+        Iterative depth-first search with an explicit stack. A prerequisite that
+        is still on the current path closes a cycle.
         
-        # If no prerequisites, we're done with this branch
-        if prereq_structure == "N/A" or not prereq_structure:
-            return
+        Args:
+            target_course: The course whose prerequisite chain is checked
+            
+        Returns:
+            List of cycles, each a list of course IDs in prerequisite order
+        """
+        # The closure index knows which courses sit on a cycle; skip the walk
+        # when neither the target nor anything it requires is one of them
+        if not self.courses:
+            return []
+        closure = self.courses.closure()
+        if target_course not in closure.index:
+            return []
+        on_cycle = {closure.ids[i] for i in closure.cyclic}
+        if target_course not in on_cycle and on_cycle.isdisjoint(closure.ancestors(target_course)):
+            return []
         
-        # Parse the prerequisites structure
-        prereq_nodes = self._parse_prerequisites(prereq_structure, course_id)
+        cycles = []
+        done = set()
+        path = []
+        on_path = {}
+        stack = [(target_course, iter(self._prereq_courses(target_course)))]
+        on_path[target_course] = 0
+        path.append(target_course)
+        
+        while stack:
+            course, prereqs = stack[-1]
+            for prereq in prereqs:
+                if prereq in on_path:
+                    cycles.append(path[on_path[prereq]:])
+                elif prereq not in done:
+                    on_path[prereq] = len(path)
+                    path.append(prereq)
+                    stack.append((prereq, iter(self._prereq_courses(prereq))))
+                    break
+            else:
+                stack.pop()
+                path.pop()
+                del on_path[course]
+                done.add(course)
         
-        # Add edges from each prerequisite to the current course
-        for prereq_node in prereq_nodes:
-            self.G.add_edge(prereq_node, course_id)
-            
-            # If this is a real course (not an OR group), recursively add its prerequisites
-            if not prereq_node.startswith("OR_GROUP_"):
-                self._add_course_prerequisites(prereq_node, current_depth + 1, max_depth)
+        return cycles
     
     def _parse_prerequisites(self, prereq_structure, target_course):
         """
@@ -0,0 +1,149 @@
+"""
+Local recursive-descent parser for catalog prerequisite text.
+
+Most prerequisite strings follow a small grammar:
+
+    text       := expression ("." annotation)* "."?
+    expression := term (("and" | "or") term)*      one operator per level, else unparsed
+    term       := "(" expression ")" | course | exam | "Placement into" course
+    course     := DEPT NUMBER [ "(min grade =" GRADE ")" ]  e.g. "I&C SCI 46", "MATH H2D"
+    exam       := ("AP" | "SAT" | "ACT") Title Words     e.g. "AP Calculus BC"
+
+The annotations that follow are the grade, minimum-score, in-progress, placement, writing
+requirement and "Recommended:" notes the catalog attaches; they never change which courses
+are required, so they are checked and dropped. A text that is only such a note (or
+"Prerequisites vary") parses to "N/A".
+
+parse_prerequisites(text) returns the same {"and": [...]} / {"or": [...]} / "COURSE" shape
+as parsed_prerequisites, or None for anything outside the grammar, which is then left to
+the LLM. Run directly for a corpus check against the checked-in parses:
+
+    python prereq_grammar.py [course_data_with_logical_prereqs.json]
+"""
+import json
+import re
+import sys
+import time
+
+DEPT = r"[A-Z][A-Z0-9&]*(?: [A-Z][A-Z0-9&]*)*"
+NUMBER = r"H?\d+[A-Z]*"
+COURSE_RE = re.compile(rf"{DEPT} {NUMBER}")
+EXAM_RE = re.compile(r"(?:AP|SAT|ACT) [A-Z][A-Za-z]*(?: [A-Z][A-Za-z]*)*")
+MIN_GRADE_RE = re.compile(r"\s*\(min(?:imum)? grade\s*=\s*[A-F][+-]?\)", re.IGNORECASE)
+TOKEN_RE = re.compile(r"\(|\)|[^\s()]+")
+SENTENCE_RE = re.compile(r"\.\s+(?=[A-Z(])")
+
+NAME = rf"(?:{DEPT} {NUMBER}|(?:AP|SAT|ACT) [A-Z][A-Za-z ]*?)"
+ANNOTATIONS = [
+    re.compile(rf"{NAME} with a grade of [A-F][+-]? or better"),
+    re.compile(rf"{NAME} with a minimum score of \d+"),
+    re.compile(rf"In Progress(?: \(IP\))? grade for {NAME}(?: or {NAME})* (?:is )?also accepted"),
+    re.compile(r"Placement via .* (?:is )?(?:also|may also be) accepted.*"),
+    re.compile(r"Satisfactory completion of the Lower-Division Writing requirement"),
+    re.compile(r"Recommended: .*"),
+]
+# Sentences that, on their own, mean there is no course requirement
+NO_REQUIREMENT = [ANNOTATIONS[-2], ANNOTATIONS[-1], re.compile(r"Prerequisites vary")]
+
+
+class _Parser:
+    """Recursive descent over the tokens of one expression; raises ValueError when lost."""
+
+    def __init__(self, text):
+        self.tokens = TOKEN_RE.findall(text)
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def parse(self):
+        node = self.expression()
+        if self.peek() is not None:
+            raise ValueError(f"unexpected {self.peek()!r}")
+        return node
+
+    def expression(self):
+        items, op = [self.term()], None
+        while self.peek() in ("and", "or"):
+            if op is not None and self.peek() != op:
+                raise ValueError("mixed and/or without parentheses")
+            op = self.tokens[self.pos]
+            self.pos += 1
+            items.append(self.term())
+        # Placement is not a course requirement, so it can only be dropped as an alternative
+        if None in items and op != "or":
+            raise ValueError("placement outside an or-group")
+        items = [item for item in items if item is not None]
+        if op is None or len(items) == 1:
+            if not items:
+                raise ValueError("no course in group")
+            return items[0]
+        # Same-operator groups flatten into their parent
+        flat = []
+        for item in items:
+            flat.extend(item[op] if isinstance(item, dict) and op in item else [item])
+        return {op: flat}
+
+    def term(self):
+        if self.peek() == "(":
+            self.pos += 1
+            node = self.expression()
+            if self.peek() != ")":
+                raise ValueError("unclosed parenthesis")
+            self.pos += 1
+            return node
+
+        # A name is the run of words up to the next operator or parenthesis
+        words = []
+        while self.peek() not in (None, "(", ")", "and", "or"):
+            words.append(self.tokens[self.pos])
+            self.pos += 1
+        name = " ".join(words)
+        if name.startswith("Placement into ") and COURSE_RE.fullmatch(name[15:]):
+            return None
+        if COURSE_RE.fullmatch(name) or EXAM_RE.fullmatch(name):
+            return name
+        raise ValueError(f"not a course: {name!r}")
+
+
+def parse_prerequisites(text):
+    """Parsed structure of text, "N/A" if it names no requirement, None if outside the grammar."""
+    if not text or text == "N/A":
+        return "N/A"
+    text = MIN_GRADE_RE.sub("", " ".join(text.split())).rstrip(".")
+    expression, *annotations = SENTENCE_RE.split(text)
+    if any(a.fullmatch(expression) for a in NO_REQUIREMENT):
+        return "N/A"
+    if not all(any(a.fullmatch(sentence) for a in ANNOTATIONS) for sentence in annotations):
+        return None
+    try:
+        return _Parser(expression).parse()
+    except ValueError:
+        return None
+
+
+def corpus_report(json_file="course_data_with_logical_prereqs.json"):
+    """Coverage of the local parser on a parsed catalog, and agreement with its stored parses."""
+    with open(json_file, "r", encoding="utf-8") as f:
+        courses = json.load(f)
+    texts = [(cid, c.get("prerequisites", "N/A"), c.get("parsed_prerequisites")) for cid, c in courses.items()]
+    with_text = [t for t in texts if t[1] and t[1] != "N/A"]
+
+    start = time.perf_counter()
+    parsed = [(cid, text, stored, parse_prerequisites(text)) for cid, text, stored in with_text]
+    elapsed = time.perf_counter() - start
+
+    covered = [p for p in parsed if p[3] is not None]
+    disagree = [p for p in covered if p[2] is not None and p[3] != p[2]]
+    print(f"{json_file}: {len(with_text)} courses with prerequisite text")
+    print(f"Parsed locally: {len(covered)} ({len(covered) / max(len(with_text), 1) * 100:.1f}%), "
+          f"{elapsed / max(len(with_text), 1) * 1e6:.1f} us per string")
+    print(f"Left for the LLM: {len(with_text) - len(covered)}")
+    print(f"Differing from the stored parse: {len(disagree)}")
+    for cid, text, stored, local in disagree[:10]:
+        print(f"  {cid}: {text}\n    stored: {json.dumps(stored)}\n    local:  {json.dumps(local)}")
+    return len(covered), len(with_text), len(disagree)
+
+
+if __name__ == "__main__":
+    corpus_report(*sys.argv[1:])
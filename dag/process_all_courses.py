@@ -1,6 +1,6 @@
 import os
-import json
 from course_dag_visualizer import CoursePrereqVisualizer
+from course_store import resident_memory_mb
 
 def process_all_courses(output_dir='all_course_graphs', json_file='course_data_with_logical_prereqs.json', depth=2):
     """Generate graphs for all courses with prerequisites."""
@@ -8,19 +8,14 @@ def process_all_courses(output_dir='all_course_graphs', json_file='course_data_w
         os.makedirs(output_dir)
     
     visualizer = CoursePrereqVisualizer(json_file)
-    
-    # Load the course data
-    try:
-        with open(json_file, 'r', encoding='utf-8') as f:
-            courses = json.load(f)
-    except Exception as e:
-        print(f"Error loading course data: {e}")
+    courses = visualizer.courses
+    if not courses:
         return
     
     # Count courses with actual prerequisites
     courses_with_prereqs = [
-        course_id for course_id, data in courses.items() 
-        if data.get("parsed_prerequisites") not in ["N/A", None, ""]
+        course_id for course_id in courses
+        if courses.prerequisites(course_id) not in ["N/A", None, ""]
     ]
     
     print(f"Found {len(courses_with_prereqs)} courses with prerequisites.")
@@ -35,6 +30,7 @@ def process_all_courses(output_dir='all_course_graphs', json_file='course_data_w
             print(f"  Error processing {course_id}: {e}")
     
     print(f"Completed processing {len(courses_with_prereqs)} courses.")
+    print(f"Resident memory: {resident_memory_mb():.1f} MB")
 
 if __name__ == "__main__":
     process_all_courses()
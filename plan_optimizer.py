@@ -1,7 +1,7 @@
 import streamlit as st
 import pandas as pd
-from src.planner import CoursePlanner
-from src.utils import load_availability
+from src.planner import PlanDelta
+from src.utils import load_availability, load_terms, planner_cache
 from src.config import Config, setup_page, setup_home_page, setup_planner_page
 
 
@@ -61,16 +61,34 @@ with st.sidebar:
     # Trim electives to only the selected courses
     electives = electives[electives[ID].isin(elective_selected)]
     all_courses = pd.concat([core, electives], ignore_index=True).sort_values(by=['CoursesID'])
-    all_courses.to_csv(CONFIG.student_pick, index=False)
 
 
-    st.session_state['student_plan'] = CoursePlanner(
-        data_path=CONFIG.student_pick,
-        planned_years=years,
-        max_units_per_sem=max_units,
-        completed_courses=completion,
-        sessions=sessions
-        )
+    # Only a different course list needs a new planner, other inputs are
+    # applied to the existing plan as deltas. The planner is a clone of a
+    # template compiled once per process from the rows in memory, so sessions
+    # with the same picks share the catalog but never each other's plan. Picks
+    # are a set, as in PlannerCache.key, so reordering them keeps the plan
+    plan_key = (major, tuple(sorted(set(elective_selected))), years, start_year)
+    if st.session_state.get('plan_key') != plan_key:
+        st.session_state['plan_key'] = plan_key
+        student_plan = planner_cache().planner(
+            major, elective_selected, sessions, years, max_units, completion,
+            records=lambda: all_courses.to_dict('records')
+            )
+        # Each planned year is offered as in its own academic year's listings
+        student_plan.terms = load_terms(CONFIG.availability_terms)
+        student_plan.start_year = int(start_year) if start_year.strip().isdigit() else None
+        st.session_state['student_plan'] = student_plan
+    else:
+        student_plan = st.session_state['student_plan']
+        deltas = []
+        if max_units != student_plan.max_units_per_sem:
+            deltas.append(PlanDelta('max_units', value=max_units))
+        if sessions != student_plan.sessions:
+            deltas.append(PlanDelta('sessions', value=sessions))
+        deltas += [PlanDelta('complete', c) for c in completion if c not in student_plan.completed_courses]
+        deltas += [PlanDelta('uncomplete', c) for c in student_plan.completed_courses if c not in completion]
+        student_plan.replan(deltas)
     
 
 
@@ -87,45 +105,60 @@ with tab2:
     t2_lcol, t2_rcol = st.columns(CONFIG.sixths)
     setup_planner_page(t2_rcol, CONFIG)
     
-    # Keep for @cache_data
-    availability_list = load_availability(CONFIG.availability)
+    for cycle in student_plan.cycles:
+        t2_rcol.warning(f'Prerequisite cycle, these cannot be ordered: {" -> ".join(cycle)}', icon="⚠️")
+
+    # Keep for @cache_resource
+    availability = load_availability(CONFIG.availability)
 
     # Filter out courses that are not offered this year
-    courses_avail = {}
     for k in student_plan.course_dict.keys():
-        if k in availability_list:
-            courses_avail[k] = availability_list[k]
-        else:
+        if k not in availability:
             t2_rcol.warning(
                 f'Looks like {k} is not offered this school year, pick another elective', 
                 icon="⚠️"
                 )
+    courses_avail = availability.restrict(student_plan.course_dict.keys())
 
+    terms, first_year = student_plan.terms, student_plan.start_year
     session = {}
     for i in range(years):
         for season in quarter_seasons:
             k = f'{season}{i}'
+            options = courses_avail.options(season)
+            if terms is not None and first_year is not None:
+                options = [c for c in options if terms.is_offered(c, first_year + i, season)]
             session.setdefault(k, [])
             session[k] = t2_rcol.multiselect(
                 f'**{k}**',
-                [k for k, v in courses_avail.items() if season in v],
+                options,
                 key=k
             )
 
-    courses_avail = {k: v for k, v in sorted(courses_avail.items(), key=lambda item: len(item[1]))}
+    courses_avail = courses_avail.by_count()
     
     if t2_rcol.button('Generate Plan'):
         t2_rcol.success('Successfully generated!', icon="✅")
         st.balloons()
-        for i in range(years):
-            for season in quarter_seasons:
-                k = f'{season}{i}'
-                if k in st.session_state:
-                    student_plan.fixed_core_course(k, session[k])
+        # Pin changes only move the pinned courses' prerequisite chains
+        pinned = student_plan.pinned
+        deltas = []
+        for k, courses in session.items():
+            if k in st.session_state:
+                deltas += [PlanDelta('pin', c, k) for c in courses if c not in pinned[k]]
+                deltas += [PlanDelta('unpin', c, k) for c in pinned[k] if c not in courses]
+        student_plan.replan(deltas)
+        student_plan.build_plan(courses_avail)
 
-        student_plan.build_plan(courses_avail) 
         t2_lcol.header('Potential Plan(s)')
         t2_lcol.table(student_plan.schedule)
+
+        t2_lcol.subheader('Alternatives')
+        for i, plan in enumerate(student_plan.iter_plans(courses_avail, k=3, time_limit=5)):
+            t2_lcol.write(f'**Plan {i + 1}**')
+            t2_lcol.table(plan.schedule)
+            if plan.dropped:
+                t2_lcol.warning(f'Could not fit: {", ".join(plan.dropped)}', icon="⚠️")
         
 
 with tab3:
@@ -0,0 +1,146 @@
+import threading
+from collections.abc import Mapping
+
+
+class AvailabilityIndex(Mapping):
+    # Read-only {course id: [sessions]} with what the planner page and
+    # build_plan look up precomputed: a bitmask per course over `sessions`,
+    # the courses offered in each session and an ordering by how many
+    # sessions a course is offered in. Views derived from an index (a course
+    # subset, the count ordering, planner session offsets) are memoized on
+    # it, so a shared index answers every rerun without rebuilding them.
+    _lock = threading.Lock()
+
+    def __init__(self, availability: dict, sessions: tuple = None, memo_size: int = 32) -> None:
+        self._seasons = {cid: list(seasons) for cid, seasons in availability.items()}
+        self.sessions = tuple(dict.fromkeys([
+            *(sessions or ()),
+            *(s for seasons in self._seasons.values() for s in seasons)
+            ]))
+        self._bit = bit = {s: 1 << b for b, s in enumerate(self.sessions)}
+
+        self.masks = {}
+        self._options = {s: [] for s in self.sessions}
+        for cid, seasons in self._seasons.items():
+            mask = 0
+            for s in dict.fromkeys(seasons):
+                mask |= bit[s]
+                self._options[s].append(cid)
+            self.masks[cid] = mask
+        self._options = {s: tuple(courses) for s, courses in self._options.items()}
+
+        self._memo_size = memo_size
+        self._restricted = {}
+        self._offsets = {}
+        self._by_count = None
+
+
+    def __getitem__(self, course: str) -> list:
+        return self._seasons[course]
+
+
+    def __iter__(self):
+        return iter(self._seasons)
+
+
+    def __len__(self) -> int:
+        return len(self._seasons)
+
+
+    def __contains__(self, course: object) -> bool:
+        return course in self._seasons
+
+
+    def offered(self, course: str, session: str) -> bool:
+        return bool(self.masks.get(course, 0) & self._bit.get(session, 0))
+
+
+    def options(self, session: str) -> tuple:
+        # Courses offered in session, in index order
+        return self._options.get(session, ())
+
+
+    def __memo(self, table: dict, key: tuple, build) -> object:
+        with self._lock:
+            value = table.get(key)
+        if value is None:
+            value = build()
+            with self._lock:
+                table[key] = value
+                while len(table) > self._memo_size:
+                    table.pop(next(iter(table)))
+        return value
+
+
+    def restrict(self, courses) -> 'AvailabilityIndex':
+        # Index over the listed courses that have availability, in the given order
+        courses = tuple(courses)
+        return self.__memo(self._restricted, courses, lambda: AvailabilityIndex(
+            {cid: self._seasons[cid] for cid in courses if cid in self._seasons},
+            self.sessions,
+            self._memo_size
+            ))
+
+
+    def by_count(self) -> 'AvailabilityIndex':
+        # Same index ordered by number of sessions offered, fewest first (stable)
+        if self._by_count is None:
+            order = sorted(self._seasons, key=lambda cid: len(self._seasons[cid]))
+            self._by_count = AvailabilityIndex(
+                {cid: self._seasons[cid] for cid in order},
+                self.sessions,
+                self._memo_size
+                )
+        return self._by_count
+
+
+    def offsets(self, sessions: list) -> dict:
+        # {course id: offsets into a planner's session list}, in each course's session order
+        key = tuple(sessions)
+
+        def build() -> dict:
+            position = {s: idx for idx, s in enumerate(key)}
+            return {
+                cid: tuple(position[s] for s in seasons if s in position)
+                for cid, seasons in self._seasons.items()
+                }
+        return self.__memo(self._offsets, key, build)
+
+
+class SlotTable:
+    # Course index -> the planner slots it is offered in, kept as session
+    # offsets per plan year rather than as absolute slots: years[i][course] is
+    # a tuple of offsets into the planner's session list, in preference order.
+    # Years answered by the same availability snapshot share one offset table,
+    # so size grows with courses x snapshots, not courses x planned years, and
+    # slot i*n_sessions + offset is only formed for the years a window covers.
+    def __init__(self, years: list, n_sessions: int) -> None:
+        self.years = years
+        self.n_sessions = n_sessions
+        self.n_slots = len(years) * n_sessions
+        # Distinct tables in first-use order, and the table each year reads
+        self.tables = list({id(t): t for t in years}.values())
+        position = {id(t): j for j, t in enumerate(self.tables)}
+        self.year_table = [position[id(t)] for t in years]
+        n_courses = len(years[0]) if years else 0
+        self._offered = bytearray(any(t[c] for t in self.tables) for c in range(n_courses))
+
+
+    def offered(self, course: int) -> bool:
+        # Offered in at least one planned year
+        return bool(self._offered[course])
+
+
+    def slots(self, course: int, lo: int = 0, hi: int = None) -> list:
+        # Absolute slots in [lo, hi) course is offered in, year by year
+        n = self.n_sessions
+        hi = self.n_slots if hi is None else min(hi, self.n_slots)
+        out = []
+        for i in range(max(lo, 0) // n, len(self.years)):
+            if i * n >= hi:
+                break
+            for o in self.years[i][course]:
+                k = i * n + o
+                if lo <= k < hi:
+                    out.append(k)
+        return out
@@ -0,0 +1,158 @@
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+from src.availability import AvailabilityIndex
+from src.catalog import Catalog
+from src.planner import CoursePlanner
+from src.scraper import scape_read_csv
+from src.snapshot import load_snapshot, open_snapshot
+
+
+class StudentRequest(NamedTuple):
+    # Per-student inputs; None falls back to the cohort defaults
+    student_id: str
+    completed_courses: list = []
+    pinned: dict = {}
+    planned_years: int = None
+    max_units_per_sem: int = None
+
+
+class StudentPlan(NamedTuple):
+    student_id: str
+    schedule: dict
+    unplaced: list
+
+
+class CohortReport(NamedTuple):
+    plans: list
+    seconds: float
+    workers: int
+
+    @property
+    def throughput(self) -> float:
+        return len(self.plans) / self.seconds if self.seconds else float('inf')
+
+
+class _Shared(NamedTuple):
+    data_path: str
+    catalog: Catalog
+    cycles: list
+    courses_avail: dict
+    planned_years: int
+    max_units_per_sem: int
+    sessions: list
+    snapshot_path: str = None
+
+
+# Compiled inputs for the current batch; forked workers inherit this from the
+# parent, spawned workers receive it once through the pool initializer
+_SHARED: _Shared = None
+
+
+def _init_worker(shared: _Shared = None) -> None:
+    global _SHARED
+    if shared is not None:
+        # A mapped catalog does not pickle; map the same snapshot file instead
+        if shared.catalog is None:
+            shared = shared._replace(catalog=open_snapshot(shared.snapshot_path).catalog)
+        _SHARED = shared
+
+
+def _plan_student(request: StudentRequest) -> StudentPlan:
+    shared = _SHARED
+    p = CoursePlanner(
+        data_path=shared.data_path,
+        planned_years=request.planned_years or shared.planned_years,
+        max_units_per_sem=request.max_units_per_sem or shared.max_units_per_sem,
+        completed_courses=request.completed_courses,
+        sessions=shared.sessions,
+        _catalog=shared.catalog,
+        _cycles=shared.cycles
+        )
+    for semester, courses in request.pinned.items():
+        p.fixed_core_course(semester, courses)
+    p.build_plan(shared.courses_avail)
+
+    schedule = p.schedule
+    placed = {c for v in schedule.values() for c in v}
+    unplaced = [c for c in shared.courses_avail if c not in placed and c not in p.completed_courses]
+    return StudentPlan(request.student_id, schedule, unplaced)
+
+
+class CohortPlanner:
+    # Loads and compiles the catalog and availability once, then plans every
+    # student of a cohort against them across a process pool
+    def __init__(self, data_path: str, availability_path: str, planned_years: int,
+                 max_units_per_sem: int, sessions: list, snapshot_path: str = None) -> None:
+        # With a snapshot_path the compiled catalog is mapped from a binary
+        # snapshot (rebuilt if the sources changed) instead of parsed from text
+        catalog = availability_list = None
+        if snapshot_path:
+            snapshot = load_snapshot([data_path], snapshot_path, availability_path)
+            catalog, availability_list = snapshot.catalog, snapshot.availability
+        template = CoursePlanner(
+            data_path=data_path,
+            planned_years=planned_years,
+            max_units_per_sem=max_units_per_sem,
+            sessions=sessions,
+            _catalog=catalog
+            )
+        if availability_list is None:
+            availability_list = AvailabilityIndex(scape_read_csv(availability_path))
+        courses_avail = availability_list.restrict(template.course_dict).by_count()
+        self._shared = _Shared(
+            data_path, template.catalog, template.cycles, courses_avail,
+            planned_years, max_units_per_sem, list(sessions), snapshot_path
+            )
+
+
+    def plan(self, requests: list, max_workers: int = None, chunksize: int = None) -> CohortReport:
+        global _SHARED
+        workers = max_workers or os.cpu_count() or 1
+        start = time.perf_counter()
+        _SHARED = self._shared
+
+        if workers == 1 or len(requests) <= 1:
+            plans = [_plan_student(r) for r in requests]
+            return CohortReport(plans, time.perf_counter() - start, 1)
+
+        # Under fork the workers already hold _SHARED, so nothing is pickled but
+        # the requests and results; other start methods ship it once per worker
+        fork = 'fork' in mp.get_all_start_methods()
+        ctx = mp.get_context('fork' if fork else None)
+        chunksize = chunksize or max(1, len(requests) // (workers * 4))
+        shared = self._shared._replace(catalog=None) if self._shared.snapshot_path else self._shared
+        with ProcessPoolExecutor(workers, mp_context=ctx, initializer=_init_worker,
+                                 initargs=() if fork else (shared,)) as pool:
+            plans = list(pool.map(_plan_student, requests, chunksize=chunksize))
+        return CohortReport(plans, time.perf_counter() - start, workers)
+
+
+def main():
+    import random
+    QUARTERS = ['Fall', 'Winter', 'Spring']
+    transferred_courses = ['ICS 6N', 'ICS 31', 'ICS 32', 'ICS 33', 'ICS 45C', 'ICS 45J', 'ICS 46', 'ICS 51']
+
+    cohort = CohortPlanner(
+        data_path='data/software_engineering.csv',
+        availability_path='data/courses_availability.csv',
+        planned_years=4,
+        max_units_per_sem=16,
+        sessions=QUARTERS
+        )
+    rng = random.Random(0)
+    requests = [
+        StudentRequest(f'student{i}', rng.sample(transferred_courses, rng.randint(0, len(transferred_courses))))
+        for i in range(2000)
+        ]
+
+    for workers in (1, None):
+        report = cohort.plan(requests, max_workers=workers)
+        print(f'{len(report.plans)} students, {report.workers} workers: '
+              f'{report.seconds:.2f}s ({report.throughput:.0f} students/s)')
+
+
+if __name__ == '__main__':
+    main()
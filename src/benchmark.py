@@ -0,0 +1,346 @@
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from src.graph import dag_leveler, topological_sort
+from src.loaders import read_availability, read_catalog_rows
+from src.planner import CoursePlanner
+from src.scraper import scape_read_csv
+
+
+QUARTERS = ['Fall', 'Winter', 'Spring']
+
+
+def generate_catalog(n_courses: int, seed: int = 0, max_prereqs: int = 3) -> tuple:
+    rng = random.Random(seed)
+    rows, avail = [], {}
+    for i in range(n_courses):
+        cid = f'SYN {i}'
+        prereqs = rng.sample(range(max(0, i - 50), i), min(i, rng.randint(0, max_prereqs)))
+        rows.append((cid, f'Synthetic {i}', '+'.join(f'SYN {p}' for p in prereqs), 4))
+        avail[cid] = rng.sample(QUARTERS, rng.randint(1, len(QUARTERS)))
+    return rows, avail
+
+
+def generate_dag_catalog(n_courses: int, seed: int = 0, depth: int = 12, fan_in: int = 3, fan_out: int = 6,
+                         units: dict = None, offer_rate: float = 0.6, sessions: list = QUARTERS) -> tuple:
+    # Courses are split into depth levels; every course past level 0 takes one
+    # prereq from the level right below (so the longest chain is depth) and up
+    # to fan_in - 1 more from any lower level, skipping courses already needed
+    # by fan_out dependents. units maps a unit count to its weight, and each
+    # session is offered with probability offer_rate (possibly none at all).
+    rng = random.Random(seed)
+    # Every level needs a course, or a level would draw prereqs from an empty range
+    depth = max(1, min(depth, n_courses))
+    units = units or {4: 0.8, 2: 0.1, 1: 0.05, 5: 0.05}
+    unit_values, unit_weights = list(units), list(units.values())
+    level_start = [l * n_courses // depth for l in range(depth + 1)]
+    n_dependents = [0] * n_courses
+
+    def pick(lo: int, hi: int, taken: set):
+        for _ in range(8):
+            p = rng.randrange(lo, hi)
+            if p not in taken and n_dependents[p] < fan_out:
+                return p
+        return None
+
+    rows, avail = [], {}
+    for level in range(depth):
+        for i in range(level_start[level], level_start[level + 1]):
+            prereqs = set()
+            if level > 0 and fan_in > 0:
+                wanted = rng.randint(1, fan_in)
+                p = pick(level_start[level - 1], level_start[level], prereqs)
+                if p is not None:
+                    prereqs.add(p)
+                while len(prereqs) < wanted:
+                    p = pick(0, level_start[level], prereqs)
+                    if p is None:
+                        break
+                    prereqs.add(p)
+            for p in prereqs:
+                n_dependents[p] += 1
+            cid = f'SYN {i}'
+            rows.append((cid, f'Synthetic {i}', '+'.join(f'SYN {p}' for p in sorted(prereqs)),
+                         rng.choices(unit_values, unit_weights)[0]))
+            avail[cid] = [s for s in sessions if rng.random() < offer_rate]
+    return rows, avail
+
+
+def write_catalog_csv(path: str, rows: list) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('CoursesID,Title,Prerequisites,Units\n')
+        for cid, title, prereqs, units in rows:
+            f.write(f'{cid},{title},{prereqs},{units}\n')
+
+
+def write_availability_csv(path: str, avail: dict) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('Course,Availability\n')
+        for cid, sessions in avail.items():
+            f.write(f'{cid},{"+".join(sessions)}\n')
+
+
+def legacy_build_plan(planner: CoursePlanner, courses_avail: dict) -> list:
+    # Pre-index placement: windows scan every slot, unit totals are re-summed
+    cat = planner.catalog
+    n_slots = len(planner._session_val)
+    schedule = [[] for _ in range(n_slots)]
+    visited = bytearray(len(cat))
+    slots = {
+        cat.index[k]: [planner._session_val[f'{s}{i}'] for i in range(planner.planned_years) for s in v]
+            for k, v in courses_avail.items()
+        }
+
+    def get_score(course, base, edges, extrema):
+        score = base
+        for n in edges(course):
+            for k, v in enumerate(schedule):
+                if n in v:
+                    score = extrema(score, k)
+        return score
+
+    def dfs(course):
+        if visited[course]:
+            return
+        visited[course] = 1
+        for prereq in cat.prereqs(course):
+            dfs(prereq)
+        min_window = get_score(course, -1, cat.prereqs, max)
+        max_window = get_score(course, n_slots, cat.dependents, min)
+        for k in slots[course]:
+            total_units = sum([cat.units[c] for c in schedule[k]])
+            if total_units + cat.units[course] <= planner.max_units_per_sem and min_window < k < max_window:
+                schedule[k].append(course)
+                return
+
+    for k in courses_avail:
+        dfs(cat.index[k])
+    return schedule
+
+
+def bench_placement(sizes: list, seed: int = 0, legacy_limit: int = 10000) -> list:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            rows, avail = generate_catalog(n, seed)
+            path = os.path.join(tmp, f'catalog_{n}.csv')
+            write_catalog_csv(path, rows)
+            years = n // len(QUARTERS) + 1
+
+            p = CoursePlanner(data_path=path, planned_years=years, max_units_per_sem=16, sessions=QUARTERS)
+            start = time.perf_counter()
+            p.build_plan(avail)
+            indexed = time.perf_counter() - start
+
+            legacy = None
+            if n <= legacy_limit:
+                p = CoursePlanner(data_path=path, planned_years=years, max_units_per_sem=16, sessions=QUARTERS)
+                start = time.perf_counter()
+                legacy_build_plan(p, avail)
+                legacy = time.perf_counter() - start
+
+            results.append({'courses': n, 'indexed_s': indexed, 'legacy_s': legacy})
+    return results
+
+
+def legacy_read_catalog_rows(path: str) -> list:
+    # Pre-loader CoursePlanner CSV read, row by row through iterrows
+    import pandas as pd
+    df = pd.read_csv(path)
+    return [
+        (row['CoursesID'],
+         row['Title'],
+         [] if pd.isnull(row['Prerequisites']) else row['Prerequisites'].split('+'),
+         row['Units'])
+        for _, row in df.iterrows()
+        ]
+
+
+def legacy_read_availability(path: str) -> dict:
+    # Pre-loader scape_read_csv
+    import pandas as pd
+    df = pd.read_csv(path)
+    course_dict = {}
+    for _, row in df.iterrows():
+        availability = row['Availability']
+        course_dict[row['Course']] = [] if pd.isnull(availability) else availability.split('+')
+    return course_dict
+
+
+def bench_loaders(sizes: list, seed: int = 0) -> list:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            rows, avail = generate_dag_catalog(n, seed)
+            catalog_path = os.path.join(tmp, f'catalog_{n}.csv')
+            avail_path = os.path.join(tmp, f'availability_{n}.csv')
+            write_catalog_csv(catalog_path, rows)
+            write_availability_csv(avail_path, avail)
+            for name, legacy, fast, path in (
+                ('catalog', legacy_read_catalog_rows, read_catalog_rows, catalog_path),
+                ('availability', legacy_read_availability, read_availability, avail_path),
+                ):
+                start = time.perf_counter()
+                legacy(path)
+                legacy_s = time.perf_counter() - start
+                start = time.perf_counter()
+                fast(path)
+                fast_s = time.perf_counter() - start
+                results.append({'rows': n, 'table': name, 'legacy_s': legacy_s, 'csv_s': fast_s})
+    return results
+
+
+def _measure(fn, *args) -> dict:
+    # Wall time from a plain run, peak traced allocation from a second run
+    start = time.perf_counter()
+    fn(*args)
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'seconds': seconds, 'peak_mb': peak / 2**20}
+
+
+def _stage(fn, *args) -> dict:
+    try:
+        return _measure(fn, *args)
+    except RecursionError as e:
+        return {'error': f'RecursionError: {e}'}
+
+
+def bench_suite(sizes: list, seed: int = 0, leveler_limit: int = 1000, **generator) -> list:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            rows, avail = generate_dag_catalog(n, seed, **generator)
+            catalog_path = os.path.join(tmp, f'catalog_{n}.csv')
+            avail_path = os.path.join(tmp, f'availability_{n}.csv')
+            write_catalog_csv(catalog_path, rows)
+            write_availability_csv(avail_path, avail)
+            years = n // len(QUARTERS) + 1
+
+            def construct():
+                return CoursePlanner(data_path=catalog_path, planned_years=years, max_units_per_sem=16, sessions=QUARTERS)
+
+            def build_plan():
+                construct().build_plan(courses_avail)
+
+            planner = construct()
+            courses_avail = scape_read_csv(avail_path)
+            dag = planner.prereq_dag.copy()
+
+            stages = {
+                'construct': _stage(construct),
+                'load_availability': _stage(scape_read_csv, avail_path),
+                'build_plan': _stage(build_plan),
+                'topological_sort': _stage(topological_sort, dag),
+                }
+            # dag_leveler runs a BFS per course and compares every pair of results
+            stages['dag_leveler'] = _stage(dag_leveler, dag) if n <= leveler_limit else {'skipped': f'> {leveler_limit} courses'}
+            results.append({'courses': n, 'stages': stages})
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_report(path: str, results: list, params: dict) -> dict:
+    report = {
+        'commit': git_commit(),
+        'created': datetime.now(timezone.utc).isoformat(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'params': params,
+        'results': results
+        }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def compare_reports(old_path: str, new_path: str) -> None:
+    with open(old_path, 'r', encoding='utf-8') as f:
+        old = json.load(f)
+    with open(new_path, 'r', encoding='utf-8') as f:
+        new = json.load(f)
+    print(f'{old["commit"] or old_path} -> {new["commit"] or new_path}')
+    before = {r['courses']: r['stages'] for r in old['results']}
+    print(f'{"courses":>8} {"stage":>18} {"old (s)":>10} {"new (s)":>10} {"speedup":>8}')
+    for r in new['results']:
+        for stage, m in r['stages'].items():
+            o = before.get(r['courses'], {}).get(stage, {})
+            if 'seconds' in m and 'seconds' in o:
+                print(f'{r["courses"]:>8} {stage:>18} {o["seconds"]:>10.3f} {m["seconds"]:>10.3f} {o["seconds"] / max(m["seconds"], 1e-9):>7.1f}x')
+
+
+def print_results(results: list) -> None:
+    print(f'{"courses":>8} {"stage":>18} {"seconds":>10} {"peak MB":>9}')
+    for r in results:
+        for stage, m in r['stages'].items():
+            if 'seconds' in m:
+                print(f'{r["courses"]:>8} {stage:>18} {m["seconds"]:>10.3f} {m["peak_mb"]:>9.1f}')
+            else:
+                print(f'{r["courses"]:>8} {stage:>18} {m.get("error") or m.get("skipped")}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Planner benchmark suite on synthetic catalogs')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000, 50000])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--depth', type=int, default=12)
+    parser.add_argument('--fan-in', type=int, default=3)
+    parser.add_argument('--fan-out', type=int, default=6)
+    parser.add_argument('--offer-rate', type=float, default=0.6)
+    parser.add_argument('--leveler-limit', type=int, default=1000)
+    parser.add_argument('--out', default='benchmark.json')
+    parser.add_argument('--compare', metavar='OLD_REPORT', help='print speedups against an earlier report')
+    parser.add_argument('--legacy', action='store_true', help='compare build_plan against the pre-index placement')
+    parser.add_argument('--loaders', action='store_true', help='compare the csv loaders against the iterrows ones')
+    args = parser.parse_args()
+
+    if args.loaders:
+        print(f'{"rows":>8} {"table":>13} {"iterrows (s)":>13} {"csv (s)":>9} {"speedup":>8}')
+        for r in bench_loaders([1000, 10000, 100000], args.seed):
+            print(f'{r["rows"]:>8} {r["table"]:>13} {r["legacy_s"]:>13.3f} {r["csv_s"]:>9.3f} '
+                  f'{r["legacy_s"] / max(r["csv_s"], 1e-9):>7.1f}x')
+        return
+
+    if args.legacy:
+        print(f'{"courses":>8} {"indexed (s)":>12} {"legacy (s)":>12} {"speedup":>8}')
+        for r in bench_placement([1000, 2000, 5000, 10000], args.seed):
+            legacy = r['legacy_s']
+            speedup = f'{legacy / r["indexed_s"]:.1f}x' if legacy else '-'
+            legacy = f'{legacy:.3f}' if legacy else '-'
+            print(f'{r["courses"]:>8} {r["indexed_s"]:>12.3f} {legacy:>12} {speedup:>8}')
+        return
+
+    params = {
+        'sizes': args.sizes, 'seed': args.seed, 'depth': args.depth, 'fan_in': args.fan_in,
+        'fan_out': args.fan_out, 'offer_rate': args.offer_rate, 'leveler_limit': args.leveler_limit
+        }
+    results = bench_suite(
+        args.sizes, args.seed, args.leveler_limit,
+        depth=args.depth, fan_in=args.fan_in, fan_out=args.fan_out, offer_rate=args.offer_rate
+        )
+    print_results(results)
+    write_report(args.out, results, params)
+    print(f'\nReport written to {args.out}')
+    if args.compare:
+        compare_reports(args.compare, args.out)
+
+
+if __name__ == '__main__':
+    main()
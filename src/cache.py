@@ -0,0 +1,86 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Callable, NamedTuple
+from src.planner import CoursePlanner
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class PlannerCache:
+    # Process-wide LRU of compiled planner templates shared by every session.
+    # A template holds the compiled catalog, cycles, closure index and session
+    # table for one (major, electives, sessions, years); sessions get clones of
+    # it that share all of that and only allocate their own plan state.
+    def __init__(self, maxsize: int = 32) -> None:
+        self.maxsize = maxsize
+        self._templates = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+
+    @staticmethod
+    def key(major: str, electives, sessions: list, planned_years: int) -> str:
+        # Elective picks are a set, session order is a preference so it stays
+        canonical = json.dumps([major, sorted(set(electives)), list(sessions), planned_years])
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+    def template(self, major: str, electives, sessions: list, planned_years: int,
+                 records: Callable[[], list]) -> CoursePlanner:
+        # records is only called on a miss, to get the catalog rows to compile
+        key = self.key(major, electives, sessions, planned_years)
+        with self._lock:
+            template = self._templates.get(key)
+            if template is not None:
+                self._templates.move_to_end(key)
+                self.hits += 1
+                return template
+            self.misses += 1
+
+        # Compile outside the lock so other sessions are not held up; a racing
+        # miss for the same key just builds an equal template
+        template = CoursePlanner(
+            data_path=records(),
+            planned_years=planned_years,
+            max_units_per_sem=0,
+            sessions=list(sessions)
+            )
+        # Clones only share a closure the template already has, so build it
+        # here rather than once per session on its first replan
+        template.closure
+        with self._lock:
+            self._templates[key] = template
+            self._templates.move_to_end(key)
+            while len(self._templates) > self.maxsize:
+                self._templates.popitem(last=False)
+                self.evictions += 1
+        return template
+
+
+    def planner(self, major: str, electives, sessions: list, planned_years: int, max_units_per_sem: int,
+                completed_courses: list, records: Callable[[], list]) -> CoursePlanner:
+        template = self.template(major, electives, sessions, planned_years, records)
+        return template.clone(max_units_per_sem, completed_courses)
+
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(self.hits, self.misses, self.evictions, len(self._templates), self.maxsize)
+
+
+    def clear(self) -> None:
+        with self._lock:
+            self._templates.clear()
@@ -0,0 +1,287 @@
+import json
+import re
+from array import array
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Callable, Iterable
+
+
+# Slot of a course that is neither completed nor placed
+NEVER = 1 << 30
+
+
+@dataclass(frozen=True)
+class Catalog:
+    # Course ids interned to dense ints: [0, n_courses) are catalog rows,
+    # [n_courses, len(ids)) are prerequisites referenced but not listed
+    ids: tuple
+    index: dict
+    titles: tuple
+    units: array
+    n_courses: int
+    pre_ptr: array
+    pre_idx: array
+    dep_ptr: array
+    dep_idx: array
+    # Prerequisite programs in CNF: course -> clauses (prog_ptr), clause -> member
+    # courses (clause_ptr/clause_idx); a clause is met when any member is done
+    prog_ptr: array
+    clause_ptr: array
+    clause_idx: array
+    _masks: dict = field(default_factory=dict, compare=False, repr=False)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def prereqs(self, course: int) -> array:
+        return self.pre_idx[self.pre_ptr[course]:self.pre_ptr[course + 1]]
+
+    def dependents(self, course: int) -> array:
+        return self.dep_idx[self.dep_ptr[course]:self.dep_ptr[course + 1]]
+
+    def clauses(self, course: int) -> list:
+        cp = self.clause_ptr
+        return [self.clause_idx[cp[c]:cp[c + 1]] for c in range(self.prog_ptr[course], self.prog_ptr[course + 1])]
+
+    def clause_masks(self, course: int) -> tuple:
+        # Bitmask per clause over course indices, built on first use
+        masks = self._masks.get(course)
+        if masks is None:
+            masks = tuple(sum(1 << m for m in set(clause)) for clause in self.clauses(course))
+            self._masks[course] = masks
+        return masks
+
+    def satisfied(self, course: int, done: int) -> bool:
+        return all(mask & done for mask in self.clause_masks(course))
+
+    def ready_slot(self, course: int, slot_of: Callable[[int], int]) -> int:
+        # First slot by which every clause has a member done (-1) or placed; a
+        # clause with no member placed yet does not hold the course back
+        lo = 0
+        for clause in self.clauses(course):
+            k = min((slot_of(m) for m in clause), default=NEVER)
+            if k < NEVER:
+                lo = max(lo, k + 1)
+        return lo
+
+    def needed_before(self, course: int, slot_of: Callable[[int], int]) -> int:
+        # Earliest placed dependent that relies on this course, i.e. no other
+        # member of the clause naming it is done or placed before that dependent
+        hi = NEVER
+        for d in self.dependents(course):
+            s = slot_of(d)
+            if s < 0 or s >= hi:
+                continue
+            for clause in self.clauses(d):
+                if course in clause and all(m == course or slot_of(m) >= s for m in clause):
+                    hi = s
+                    break
+        return hi
+
+    def find_cycles(self) -> list:
+        # Iterative Tarjan SCC over prereq edges; every component with more than
+        # one course (or a course requiring itself) is a cycle
+        n = len(self.ids)
+        order = array('i', [-1]) * n
+        low = array('i', bytes(4 * n))
+        on_stack = bytearray(n)
+        stack, cycles, counter = [], [], 0
+
+        for root in range(n):
+            if order[root] >= 0:
+                continue
+            work = [(root, 0)]
+            while work:
+                course, i = work.pop()
+                if i == 0:
+                    order[course] = low[course] = counter
+                    counter += 1
+                    stack.append(course)
+                    on_stack[course] = 1
+                edges = self.prereqs(course)
+                if i < len(edges):
+                    work.append((course, i + 1))
+                    p = edges[i]
+                    if order[p] < 0:
+                        work.append((p, 0))
+                    elif on_stack[p]:
+                        low[course] = min(low[course], order[p])
+                    continue
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[course])
+                if low[course] == order[course]:
+                    component = []
+                    while True:
+                        c = stack.pop()
+                        on_stack[c] = 0
+                        component.append(c)
+                        if c == course:
+                            break
+                    if len(component) > 1 or course in edges:
+                        cycles.append([self.ids[c] for c in reversed(component)])
+        return cycles
+
+    @classmethod
+    def from_json(cls, path: str) -> 'Catalog':
+        return cls.from_rows(read_json_rows(path))
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple]) -> 'Catalog':
+        # prereqs is either a list of course ids (all required) or a parsed
+        # {"and": [...]} / {"or": [...]} structure
+        rows = [
+            (cid, title, [[p] for p in prereqs] if isinstance(prereqs, list) else _to_cnf(prereqs), u)
+            for cid, title, prereqs, u in rows
+            ]
+        index = {}
+        for cid, _, _, _ in rows:
+            index.setdefault(cid, len(index))
+        n_courses = len(index)
+        for _, _, cnf, _ in rows:
+            for clause in cnf:
+                for p in clause:
+                    index.setdefault(p, len(index))
+
+        n = len(index)
+        titles = [''] * n
+        units = array('d', bytes(8 * n))
+        adjacency = [()] * n
+        programs = [()] * n
+        for cid, title, cnf, u in rows:
+            i = index[cid]
+            titles[i] = title
+            units[i] = u
+            programs[i] = [[index[p] for p in clause] for clause in cnf]
+            adjacency[i] = list(dict.fromkeys(p for clause in programs[i] for p in clause))
+
+        pre_ptr, pre_idx = _to_csr(adjacency)
+        prog_ptr = array('i', [0])
+        for program in programs:
+            prog_ptr.append(prog_ptr[-1] + len(program))
+        clause_ptr, clause_idx = _to_csr([clause for program in programs for clause in program])
+
+        # Dependents are the transposed prerequisite edges, counted then filled
+        counts = [0] * n
+        for p in pre_idx:
+            counts[p] += 1
+        dep_ptr = array('i', [0])
+        for c in counts:
+            dep_ptr.append(dep_ptr[-1] + c)
+        dep_idx = array('i', bytes(4 * len(pre_idx)))
+        cursor = array('i', dep_ptr[:-1])
+        for course in range(n):
+            for p in pre_idx[pre_ptr[course]:pre_ptr[course + 1]]:
+                dep_idx[cursor[p]] = course
+                cursor[p] += 1
+
+        return cls(
+            ids=tuple(index),
+            index=index,
+            titles=tuple(titles),
+            units=units,
+            n_courses=n_courses,
+            pre_ptr=pre_ptr,
+            pre_idx=pre_idx,
+            dep_ptr=dep_ptr,
+            dep_idx=dep_idx,
+            prog_ptr=prog_ptr,
+            clause_ptr=clause_ptr,
+            clause_idx=clause_idx
+            )
+
+
+def read_json_rows(path: str) -> list:
+    # Scraped catalog (dag/course_data_with_logical_prereqs.json); every course
+    # named in parsed_prerequisites becomes a prereq edge
+    with open(path, 'r', encoding='utf-8') as f:
+        courses = json.load(f)
+    return [
+        (cid, data.get('title', ''), data.get('parsed_prerequisites'), _parse_units(data.get('units')))
+        for cid, data in courses.items()
+        ]
+
+
+def _to_cnf(structure) -> list:
+    # AND concatenates clauses, OR distributes over its children's clauses
+    if isinstance(structure, dict):
+        if 'and' in structure:
+            return [clause for child in structure['and'] for clause in _to_cnf(child)]
+        if 'or' in structure:
+            # An empty OR names no alternative, so like a missing one it requires nothing
+            if not structure['or']:
+                return []
+            cnf = [[]]
+            for child in structure['or']:
+                child_cnf = _to_cnf(child)
+                if not child_cnf:
+                    # An alternative with no requirement makes the whole OR free
+                    return []
+                cnf = [list(dict.fromkeys(a + b)) for a in cnf for b in child_cnf]
+            return cnf
+        return []
+    if isinstance(structure, str) and structure and structure != 'N/A':
+        return [[structure]]
+    return []
+
+
+def _parse_units(units) -> float:
+    # Variable-unit courses ("1-4") are planned at their minimum
+    match = re.match(r'\s*(\d+(?:\.\d+)?)', str(units))
+    return float(match.group(1)) if match else 0.0
+
+
+def _to_csr(adjacency: list) -> tuple:
+    ptr = array('i', [0])
+    idx = array('i')
+    for neighbours in adjacency:
+        idx.extend(neighbours)
+        ptr.append(len(idx))
+    return ptr, idx
+
+
+class CourseView(Mapping):
+    # Read-only {course id: (title, prereqs, units)} over a Catalog
+    def __init__(self, catalog: Catalog) -> None:
+        self._catalog = catalog
+
+    def __getitem__(self, cid: str) -> tuple:
+        cat = self._catalog
+        i = cat.index[cid]
+        if i >= cat.n_courses:
+            raise KeyError(cid)
+        return cat.titles[i], [cat.ids[p] for p in cat.prereqs(i)], cat.units[i]
+
+    def __iter__(self):
+        return iter(self._catalog.ids[:self._catalog.n_courses])
+
+    def __len__(self) -> int:
+        return self._catalog.n_courses
+
+    def copy(self) -> dict:
+        return dict(self.items())
+
+
+class AdjacencyView(Mapping):
+    # Read-only {course id: [course ids]} over one CSR edge set of a Catalog
+    def __init__(self, catalog: Catalog, forward: bool = False) -> None:
+        self._catalog = catalog
+        self._forward = forward
+        self._n = len(catalog) if forward else catalog.n_courses
+
+    def __getitem__(self, cid: str) -> list:
+        cat = self._catalog
+        i = cat.index[cid]
+        if i >= self._n:
+            raise KeyError(cid)
+        edges = cat.dependents(i) if self._forward else cat.prereqs(i)
+        return [cat.ids[e] for e in edges]
+
+    def __iter__(self):
+        return iter(self._catalog.ids[:self._n])
+
+    def __len__(self) -> int:
+        return self._n
+
+    def copy(self) -> dict:
+        return dict(self.items())
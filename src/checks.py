@@ -0,0 +1,140 @@
+import argparse
+import random
+from src.benchmark import generate_dag_catalog
+from src.planner import CoursePlanner, PlanDelta
+
+
+QUARTERS = ['Fall', 'Winter', 'Spring']
+
+
+def small_planner(seed: int, n_courses: int = 7, max_units: int = 8, years: int = 1) -> tuple:
+    # A planner and availability over a random catalog small enough to enumerate
+    rows, avail = generate_dag_catalog(n_courses, seed, depth=3, offer_rate=0.6, units={4: 0.6, 2: 0.2, 5: 0.2})
+    records = [(cid, title, prereqs.split('+') if prereqs else [], units) for cid, title, prereqs, units in rows]
+    return CoursePlanner(records, years, max_units, sessions=list(QUARTERS)), avail
+
+
+def leaf_scores(search, score) -> list:
+    # Every complete plan in the search tree, scored with score(node), by brute force
+    scores = []
+    stack = [search._root()]
+    while stack:
+        node = stack.pop()
+        if node.depth == len(search._order):
+            scores.append(score(node))
+        else:
+            stack.extend(search._children(node))
+    return sorted(scores)
+
+
+def check_iter_plans(n_catalogs: int = 300, k: int = 5) -> int:
+    # iter_plans must yield the k best plans of the exhaustive enumeration, in order
+    failures = 0
+    for seed in range(n_catalogs):
+        planner, avail = small_planner(seed, n_courses=5 + seed % 4)
+        search = planner.exact_solver(avail)
+        expected = leaf_scores(search, lambda node: (node.dropped, node.span))[:k]
+        got = [plan.score for plan in planner.iter_plans(avail, k=k, max_nodes=10**6)]
+        if got != expected:
+            failures += 1
+            print(f'iter_plans seed {seed}: {got} != {expected}')
+    print(f'iter_plans: {n_catalogs - failures}/{n_catalogs} catalogs match exhaustive enumeration')
+    return failures
+
+
+def check_exact(n_catalogs: int = 300) -> int:
+    # A solve that reports optimal must match the best plan of the exhaustive enumeration
+    failures = 0
+    for seed in range(n_catalogs):
+        planner, avail = small_planner(seed, n_courses=5 + seed % 4)
+        for balance in (False, True):
+            solver = planner.exact_solver(avail, balance)
+            expected = leaf_scores(solver, solver._score)[0]
+            plan = solver.solve()
+            if not solver.optimal or plan.score != expected:
+                failures += 1
+                print(f'solve_exact seed {seed} balance={balance}: {plan.score} (optimal={solver.optimal}) != {expected}')
+    print(f'solve_exact: {2 * n_catalogs - failures}/{2 * n_catalogs} solves match exhaustive enumeration')
+    return failures
+
+
+def out_of_order(planner: CoursePlanner) -> list:
+    # (prereq, course) pairs where a planned prereq is not in an earlier quarter
+    cat, placement = planner.catalog, planner._placement
+    return [
+        (cat.ids[p], cat.ids[c]) for c in range(len(cat))
+        for p in cat.prereqs(c) if placement[c] >= 0 and placement[p] >= placement[c]
+        ]
+
+
+def check_replan_sessions(n_catalogs: int = 300) -> int:
+    # Reordering the sessions must not leave prereqs at or after their dependents
+    failures = 0
+    p = CoursePlanner([('A', 'a', [], 4), ('B', 'b', ['A'], 4)], 1, 4, sessions=list(QUARTERS))
+    p.build_plan({'A': list(QUARTERS), 'B': list(QUARTERS)})
+    p.replan([PlanDelta('sessions', value=['Winter', 'Spring', 'Fall'])])
+    if out_of_order(p):
+        failures += 1
+        print(f'replan sessions: {p.schedule}')
+
+    for seed in range(n_catalogs):
+        planner, avail = small_planner(seed, n_courses=20, max_units=12, years=2)
+        planner.build_plan(avail)
+        sessions = random.Random(seed).sample(QUARTERS, len(QUARTERS))
+        planner.replan([PlanDelta('sessions', value=sessions)])
+        wrong = out_of_order(planner)
+        if wrong:
+            failures += 1
+            print(f'replan sessions seed {seed} {sessions}: {wrong}')
+    print(f'replan sessions: {n_catalogs + 1 - failures}/{n_catalogs + 1} reorders keep prereqs first')
+    return failures
+
+
+def check_replan_pins(n_catalogs: int = 300) -> int:
+    # Pinning a course, completed or not, must not leave its dependents at or before it
+    failures = 0
+    for seed in range(n_catalogs):
+        rng = random.Random(seed)
+        planner, avail = small_planner(seed, n_courses=12, max_units=12, years=2)
+        ids = planner.catalog.ids[:planner.catalog.n_courses]
+        planner = planner.clone(completed_courses=rng.sample(ids, 3))
+        planner.build_plan(avail)
+        course = rng.choice(planner.completed_courses if seed % 2 else ids)
+        semester = rng.choice(list(planner.schedule))
+        planner.replan([PlanDelta('pin', course, semester)])
+        wrong = out_of_order(planner)
+        if wrong:
+            failures += 1
+            print(f'replan pins seed {seed} {course} -> {semester}: {wrong}')
+    print(f'replan pins: {n_catalogs - failures}/{n_catalogs} pins keep prereqs first')
+    return failures
+
+
+def check_empty_or() -> int:
+    # An OR with no alternatives requires nothing, in every planner entry point
+    rows = [('A', 'a', {'or': []}, 4), ('B', 'b', ['A'], 4), ('C', 'c', {'and': [{'or': []}, 'A']}, 4)]
+    avail = {c: list(QUARTERS) for c in 'ABC'}
+    p = CoursePlanner(rows, 1, 8, sessions=list(QUARTERS))
+    p.build_plan(avail)
+    plans = [p.schedule, next(p.iter_plans(avail, k=1)).schedule, p.solve_exact(avail).schedule]
+    expected = {'Fall0': ['A'], 'Winter0': ['B', 'C'], 'Spring0': []}
+    failures = sum(plan != expected for plan in plans)
+    if failures:
+        print(f'empty or: {plans} != {expected}')
+    print(f'empty or: {len(plans) - failures}/{len(plans)} plans treat it as no requirement')
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cross-check the planner search against brute force on small catalogs')
+    parser.add_argument('--catalogs', type=int, default=300)
+    args = parser.parse_args()
+
+    failures = (check_iter_plans(args.catalogs) + check_exact(args.catalogs) + check_replan_sessions(args.catalogs)
+                + check_replan_pins(args.catalogs) + check_empty_or())
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+from array import array
+from bisect import bisect_left
+
+
+class ClosureIndex:
+    # Transitive prerequisite closure over interned course indices. Row i of
+    # ancestors is a Python-int bitset of every course i ultimately requires
+    # (OR alternatives included), row i of descendants everything i unlocks.
+    # Optional distance rows hold, per course, its sorted ancestors with the
+    # shortest and longest prereq-edge distance to each.
+    def __init__(self, ids: tuple, prereqs: list, distances: bool = True) -> None:
+        self.ids = ids
+        self.index = {cid: i for i, cid in enumerate(ids)}
+        n = len(ids)
+        dependents = [[] for _ in range(n)]
+        for course, edges in enumerate(prereqs):
+            for p in edges:
+                dependents[p].append(course)
+
+        order, n_head = self.__topological(prereqs, dependents)
+        head, tail = order[:n_head], order[n_head:]
+        self.ancestors_bits = [0] * n
+        self.descendants_bits = [0] * n
+        # Ancestors of the acyclic head are all in the head, descendants of the
+        # tail (cycles and everything behind them) are all in the tail
+        self.__propagate(self.ancestors_bits, head, prereqs, repeat=False)
+        self.__propagate(self.ancestors_bits, tail, prereqs, repeat=True)
+        self.__propagate(self.descendants_bits, tail[::-1], dependents, repeat=True)
+        self.__propagate(self.descendants_bits, head[::-1], dependents, repeat=False)
+        self.cyclic = [i for i in tail if self.ancestors_bits[i] >> i & 1]
+
+        self._members = self._shortest = self._longest = None
+        if distances:
+            self.__distances(head, tail, prereqs)
+
+
+    @classmethod
+    def from_catalog(cls, catalog, distances: bool = True) -> 'ClosureIndex':
+        return cls(catalog.ids, [list(catalog.prereqs(i)) for i in range(len(catalog))], distances)
+
+
+    @classmethod
+    def from_adjacency(cls, adjacency: dict, distances: bool = True) -> 'ClosureIndex':
+        # {course id: [prereq ids]}; prereqs without an entry of their own are interned too
+        index = {}
+        for cid in adjacency:
+            index.setdefault(cid, len(index))
+        for edges in adjacency.values():
+            for p in edges:
+                index.setdefault(p, len(index))
+        prereqs = [[] for _ in index]
+        for cid, edges in adjacency.items():
+            prereqs[index[cid]] = list(dict.fromkeys(index[p] for p in edges))
+        return cls(tuple(index), prereqs, distances)
+
+
+    @staticmethod
+    def __topological(prereqs: list, dependents: list) -> tuple:
+        # Kahn's order, prereqs first, and its length; courses on or behind a
+        # cycle never reach in-degree zero and are appended after it
+        indegree = [len(edges) for edges in prereqs]
+        order = [i for i, d in enumerate(indegree) if d == 0]
+        for course in order:
+            for d in dependents[course]:
+                indegree[d] -= 1
+                if indegree[d] == 0:
+                    order.append(d)
+        n_head = len(order)
+        placed = set(order)
+        return order + [i for i in range(len(prereqs)) if i not in placed], n_head
+
+
+    @staticmethod
+    def __propagate(rows: list, order: list, edges: list, repeat: bool) -> None:
+        # One pass in topological order completes every row of a DAG; inside
+        # cycles the pass is repeated until no row grows
+        changed = True
+        while changed:
+            changed = False
+            for course in order:
+                bits = rows[course]
+                for e in edges[course]:
+                    bits |= rows[e] | (1 << e)
+                if bits != rows[course]:
+                    rows[course] = bits
+                    changed = repeat
+
+
+    def __distances(self, head: list, tail: list, prereqs: list) -> None:
+        # Same passes as the bitsets, carrying the shortest and longest edge
+        # count to each ancestor; members are kept sorted for bisect. Longest
+        # distances inside a cycle are unbounded and capped at the course count
+        n = len(prereqs)
+        cap = min(n, 0xFFFF)
+        members, shortest, longest = [array('i')] * n, [array('H')] * n, [array('H')] * n
+
+        def merge(course: int) -> bool:
+            near, far = {}, {}
+            for p in prereqs[course]:
+                near[p] = 1
+                far[p] = max(far.get(p, 1), 1)
+                for a, s, l in zip(members[p], shortest[p], longest[p]):
+                    if s + 1 < near.get(a, cap + 1):
+                        near[a] = min(s + 1, cap)
+                    far[a] = min(max(far.get(a, 0), l + 1), cap)
+            keys = array('i', sorted(near))
+            near = array('H', [near[a] for a in keys])
+            far = array('H', [far[a] for a in keys])
+            if keys == members[course] and near == shortest[course] and far == longest[course]:
+                return False
+            members[course], shortest[course], longest[course] = keys, near, far
+            return True
+
+        for course in head:
+            merge(course)
+        changed = True
+        while changed:
+            changed = False
+            for course in tail:
+                changed |= merge(course)
+        self._members, self._shortest, self._longest = members, shortest, longest
+
+
+    @staticmethod
+    def bits_to_indices(bits: int) -> list:
+        # Set bit positions, scanning the binary string in C rather than bit by bit
+        text = bin(bits)[:1:-1]
+        out, i = [], text.find('1')
+        while i >= 0:
+            out.append(i)
+            i = text.find('1', i + 1)
+        return out
+
+
+    def requires(self, course: str, prereq: str) -> bool:
+        return bool(self.ancestors_bits[self.index[course]] >> self.index[prereq] & 1)
+
+
+    def unlocks(self, course: str, dependent: str) -> bool:
+        return bool(self.descendants_bits[self.index[course]] >> self.index[dependent] & 1)
+
+
+    def ancestors(self, course: str) -> list:
+        return [self.ids[i] for i in self.bits_to_indices(self.ancestors_bits[self.index[course]])]
+
+
+    def descendants(self, course: str) -> list:
+        return [self.ids[i] for i in self.bits_to_indices(self.descendants_bits[self.index[course]])]
+
+
+    def distance(self, course: str, prereq: str) -> tuple:
+        # (shortest, longest) prereq-edge distance, None if course does not require prereq
+        if self._members is None:
+            raise ValueError('ClosureIndex was built without distances')
+        i, a = self.index[course], self.index[prereq]
+        row = self._members[i]
+        k = bisect_left(row, a)
+        if k == len(row) or row[k] != a:
+            return None
+        return self._shortest[i][k], self._longest[i][k]
+
+
+    def ancestors_within(self, course: str, depth: int, longest: bool = False) -> list:
+        # Ancestors reachable in at most depth prereq edges; with longest=True,
+        # only those whose longest chain to course also fits within depth
+        if self._members is None:
+            raise ValueError('ClosureIndex was built without distances')
+        i = self.index[course]
+        dist = self._longest[i] if longest else self._shortest[i]
+        return [self.ids[a] for a, d in zip(self._members[i], dist) if d <= depth]
+
+
+    def levels(self, course: str) -> dict:
+        # {shortest distance: [ancestors]}, the layers a BFS from course would find
+        if self._members is None:
+            raise ValueError('ClosureIndex was built without distances')
+        i = self.index[course]
+        layers = {}
+        for a, d in zip(self._members[i], self._shortest[i]):
+            layers.setdefault(d, []).append(self.ids[a])
+        return layers
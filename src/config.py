@@ -10,7 +10,7 @@ class Config(NamedTuple):
     ds = 'data\data_science.csv'
     ds_ext = 'data\data_science_ext.csv'
     availability = 'data\courses_availability.csv'
-    student_pick = 'data\\student_pick.csv'
+    availability_terms = 'data\courses_availability_terms.csv'
 
     # Option lists
     quarters = ['Fall', 'Winter', 'Spring', 'Summer']
@@ -0,0 +1,89 @@
+import numpy as np
+from src.catalog import Catalog
+
+
+class Frontier:
+    # "Completed by slot t" is a packed uint64 bitset over interned course ids.
+    # One vectorised pass over the catalog's CNF members finds every course whose
+    # clauses are all met, so a slot costs O(members + courses / 64) word ops.
+    def __init__(self, catalog: Catalog) -> None:
+        self.n = len(catalog)
+        self.n_words = (self.n + 63) // 64
+        clause_ptr = np.frombuffer(catalog.clause_ptr, dtype=np.int32)
+        prog_ptr = np.frombuffer(catalog.prog_ptr, dtype=np.int32)
+        members = np.frombuffer(catalog.clause_idx, dtype=np.int32)
+        self.n_clauses = len(clause_ptr) - 1
+        self.members = members
+        self.member_clause = np.repeat(np.arange(self.n_clauses), np.diff(clause_ptr))
+        self.clause_course = np.repeat(np.arange(self.n), np.diff(prog_ptr))
+        self._word = members >> 6
+        self._bit = (members & 63).astype(np.uint64)
+
+
+    def empty(self) -> np.ndarray:
+        return np.zeros(self.n_words, dtype=np.uint64)
+
+
+    def add(self, bits: np.ndarray, courses: np.ndarray) -> None:
+        courses = np.asarray(courses, dtype=np.int64)
+        np.bitwise_or.at(bits, courses >> 6, np.left_shift(np.uint64(1), (courses & 63).astype(np.uint64)))
+
+
+    def to_bool(self, bits: np.ndarray) -> np.ndarray:
+        return np.unpackbits(bits.view(np.uint8), bitorder='little')[:self.n].astype(bool)
+
+
+    def clauses_met(self, bits: np.ndarray) -> np.ndarray:
+        hit = (bits[self._word] >> self._bit) & np.uint64(1)
+        return np.bincount(self.member_clause, weights=hit, minlength=self.n_clauses) > 0
+
+
+    def eligible(self, bits: np.ndarray, live: np.ndarray = None) -> np.ndarray:
+        # Courses whose every clause has a member in bits; clauses that are not
+        # live (no member can ever be done) are treated as met
+        met = self.clauses_met(bits)
+        if live is not None:
+            met |= ~live
+        unmet = np.bincount(self.clause_course, weights=~met, minlength=self.n)
+        return unmet == 0
+
+
+    def live_clauses(self, reachable: np.ndarray) -> np.ndarray:
+        return np.bincount(self.member_clause, weights=reachable[self.members], minlength=self.n_clauses) > 0
+
+
+    def schedule(self, targets: np.ndarray, rank: np.ndarray, offered: np.ndarray, offered_row: np.ndarray,
+                 units: np.ndarray, max_units: float, done: np.ndarray, pinned: list, slot_units: np.ndarray,
+                 deadline: np.ndarray) -> list:
+        # Level-by-level list scheduling: at each slot take the eligible, offered,
+        # still pending targets in rank order while the unit cap allows.
+        # targets/done are bool[n]; offered is bool[rows, n] and slot t is offered
+        # what row offered_row[t] says, so years sharing availability share rows;
+        # pinned[t] lists course ids fixed in slot t; deadline[c] is the first
+        # slot c may not use.
+        n_slots = len(pinned)
+        pending = targets & ~done
+        live = self.live_clauses(targets | done | np.isin(np.arange(self.n), [c for p in pinned for c in p]))
+
+        bits = self.empty()
+        self.add(bits, np.flatnonzero(done))
+        placements = []
+        for t in range(n_slots):
+            if not pending.any():
+                break
+            ok = pending & offered[offered_row[t]] & (deadline > t) & self.eligible(bits, live)
+            candidates = np.flatnonzero(ok)
+            candidates = candidates[np.argsort(rank[candidates], kind='stable')]
+
+            room = max_units - slot_units[t]
+            placed = []
+            for c in candidates:
+                if units[c] <= room:
+                    room -= units[c]
+                    placed.append(c)
+            placements.extend((int(c), t) for c in placed)
+
+            # Courses taken in slot t only count as completed from slot t + 1
+            pending[placed] = False
+            self.add(bits, np.array(placed + list(pinned[t]), dtype=np.int64))
+        return placements
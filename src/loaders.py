@@ -0,0 +1,65 @@
+import csv
+from src.catalog import Catalog, _parse_units
+
+
+# Pandas-free readers for the data/ CSV schemas. One pass of csv.reader per
+# file, columns looked up by header name, so cost is linear in the rows.
+
+
+def _columns(reader, *names: str) -> tuple:
+    header = next(reader)
+    return tuple(header.index(name) for name in names)
+
+
+def read_catalog_rows(path: str) -> list:
+    # CoursesID,Title,Prerequisites,Units -> (id, title, [prereq ids], units)
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        cid, title, prereqs, units = _columns(reader, 'CoursesID', 'Title', 'Prerequisites', 'Units')
+        return [
+            (row[cid], row[title], row[prereqs].split('+') if row[prereqs] else [], _parse_units(row[units]))
+            for row in reader if row
+            ]
+
+
+def records_to_rows(records) -> list:
+    # In-memory catalog rows: dicts in the CSV schema (e.g. DataFrame.to_dict('records'),
+    # where a missing Prerequisites cell is NaN) or ready (id, title, prereqs, units) tuples
+    rows = []
+    for record in records:
+        if isinstance(record, dict):
+            record = (record['CoursesID'], record['Title'], record['Prerequisites'], record['Units'])
+        cid, title, prereqs, units = record
+        if isinstance(prereqs, str):
+            prereqs = prereqs.split('+') if prereqs else []
+        elif not isinstance(prereqs, (list, dict)):
+            prereqs = []
+        rows.append((cid, title, prereqs, _parse_units(units)))
+    return rows
+
+
+def load_catalog(source) -> Catalog:
+    # source: a compiled Catalog, in-memory records, a .json scrape or a .csv path
+    if isinstance(source, Catalog):
+        return source
+    if not isinstance(source, str):
+        return Catalog.from_rows(records_to_rows(source))
+    if source.endswith('.json'):
+        return Catalog.from_json(source)
+    return Catalog.from_rows(read_catalog_rows(source))
+
+
+def read_availability(path: str) -> dict:
+    # Course,Availability -> {course id: [sessions]}
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        course, availability = _columns(reader, 'Course', 'Availability')
+        return {row[course]: row[availability].split('+') if row[availability] else [] for row in reader if row}
+
+
+def read_term_availability(path: str) -> list:
+    # Course,Year,Session -> [(course id, academic year, session)], one row per offering
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        course, year, session = _columns(reader, 'Course', 'Year', 'Session')
+        return [(row[course], int(row[year]), row[session]) for row in reader if row]
@@ -1,132 +1,547 @@
-import pandas as pd
+from array import array
 from dataclasses import dataclass
-from typing import Callable
+from typing import Iterator, NamedTuple
+from src.availability import AvailabilityIndex, SlotTable
+from src.catalog import NEVER, Catalog, CourseView, AdjacencyView
+from src.closure import ClosureIndex
+from src.loaders import load_catalog
+from src.search import ExactSolver, Plan, PlanSearch
+from src.terms import TermAvailability
+
+
+class PlanDelta(NamedTuple):
+    # kind: 'pin' / 'unpin' (course, semester), 'complete' / 'uncomplete' (course),
+    # 'max_units' (value), 'sessions' (value = new session list)
+    kind: str
+    course: str = None
+    semester: str = None
+    value: object = None
 
 
 @dataclass
 class CoursePlanner:
-    data_path: str
+    # Path to a .csv/.json catalog, in-memory catalog records or a compiled Catalog
+    data_path: object
     planned_years: int
     max_units_per_sem: int
     completed_courses: list = None
     sessions: list = None
-    _cdict: dict = None
-    _pdag: dict = None
-    _fdag: dict = None
+    # Per-year availability; plan year i is academic year start_year + i
+    terms: TermAvailability = None
+    start_year: int = None
+    _catalog: Catalog = None
     _session_val: dict = None
-    _schedule: dict = None
-    _visited: set = None
+    _schedule: list = None
+    _placement: array = None
+    _slot_units: array = None
+    _first_open: int = 0
+    _visited: bytearray = None
+    _pinned: bytearray = None
+    _done: bytearray = None
+    _done_bits: int = 0
+    _courses_avail: dict = None
+    _cycles: list = None
+    _closure: ClosureIndex = None
+
+    @property
+    def catalog(self) -> Catalog:
+        return self._catalog
 
     @property
-    def course_dict(self) -> dict:
-        return self._cdict
-    
+    def cycles(self) -> list:
+        return self._cycles
+
     @property
-    def prereq_dag(self) -> dict:
-        return self._pdag
-    
+    def closure(self) -> ClosureIndex:
+        # Built on first use; reachability only, the planner needs no distances
+        if self._closure is None:
+            self._closure = ClosureIndex.from_catalog(self._catalog, distances=False)
+        return self._closure
+
     @property
-    def forward_dag(self) -> dict:
-        return self._fdag
-    
+    def course_dict(self) -> CourseView:
+        return CourseView(self._catalog)
+
+    @property
+    def prereq_dag(self) -> AdjacencyView:
+        return AdjacencyView(self._catalog)
+
+    @property
+    def forward_dag(self) -> AdjacencyView:
+        return AdjacencyView(self._catalog, forward=True)
+
     @property
     def schedule(self) -> dict:
-        return self._schedule
+        ids = self._catalog.ids
+        return {k: [ids[c] for c in self._schedule[v]] for k, v in self._session_val.items()}
+
+    @property
+    def pinned(self) -> dict:
+        ids = self._catalog.ids
+        return {k: [ids[c] for c in self._schedule[v] if self._pinned[c]] for k, v in self._session_val.items()}
 
     def __post_init__(self) -> None:
-        self._cdict = self.__read_csv_to_dict()
-        self._pdag = self.__build_pdag(self._cdict)
-        self._fdag = self.__build_fdag(self._cdict)
-        self._session_val = {
-            f'{s}{i}': i*len(self.sessions) + idx 
-                for i in range(self.planned_years)
-                for idx, s in enumerate(self.sessions) 
-            }
-        self._schedule = {k: [] for k in self._session_val.keys()}
-
-        self._visited = set()
-        if self.completed_courses:
-            for course in self.completed_courses:
-                self._visited.add(course)
-
-
-    def __read_csv_to_dict(self) -> dict:
-        df = pd.read_csv(self.data_path)
-        return {
-            row['CoursesID']: 
-                (row['Title'], 
-                 [] if pd.isnull(row['Prerequisites']) else row['Prerequisites'].split('+'), 
-                 row['Units']) 
-            for _, row in df.iterrows()
-            }
+        # A catalog compiled elsewhere (e.g. shared across a cohort) is reused as is
+        if self._catalog is None:
+            self._catalog = load_catalog(self.data_path)
+        # Planning still terminates on a cycle (the back edge is ignored), but the
+        # courses involved cannot be ordered, so surface them before planning
+        if self._cycles is None:
+            self._cycles = self._catalog.find_cycles()
+        # Only ever replaced, never mutated, so clones can share the template's
+        if self._session_val is None:
+            self._session_val = {
+                f'{s}{i}': i*len(self.sessions) + idx
+                    for i in range(self.planned_years)
+                    for idx, s in enumerate(self.sessions)
+                }
+        self._schedule = [[] for _ in self._session_val]
+        self._placement = array('i', [-1]) * len(self._catalog)
+        self._slot_units = array('d', bytes(8 * len(self._schedule)))
+
+        self._visited = bytearray(len(self._catalog))
+        self._pinned = bytearray(len(self._catalog))
+        self._done = bytearray(len(self._catalog))
+        self.completed_courses = list(self.completed_courses or [])
+        for course in self.completed_courses:
+            if course in self._catalog.index:
+                self.__set_done(self._catalog.index[course], True)
+                self._visited[self._catalog.index[course]] = 1
+
+
+    def clone(self, max_units_per_sem: int = None, completed_courses: list = None) -> 'CoursePlanner':
+        # Fresh plan state over this planner's compiled catalog and session table,
+        # which are shared rather than copied; only the per-plan arrays are new
+        return CoursePlanner(
+            data_path=self.data_path,
+            planned_years=self.planned_years,
+            max_units_per_sem=self.max_units_per_sem if max_units_per_sem is None else max_units_per_sem,
+            completed_courses=completed_courses,
+            sessions=list(self.sessions),
+            terms=self.terms,
+            start_year=self.start_year,
+            _catalog=self._catalog,
+            _session_val=self._session_val,
+            _cycles=self._cycles,
+            _closure=self._closure
+            )
+
+
+    def __set_done(self, course: int, done: bool) -> None:
+        self._done[course] = done
+        if done:
+            self._done_bits |= 1 << course
+        else:
+            self._done_bits &= ~(1 << course)
 
 
-    def __build_pdag(self, course_dict: dict) -> dict:
-        return {k: v[1] for k, v in course_dict.items()}
+    def __slot_of(self, course: int) -> int:
+        if self._done[course]:
+            return -1
+        k = self._placement[course]
+        return k if k >= 0 else NEVER
 
 
-    def __build_fdag(self, course_dict: dict) -> dict:
-        dag = {} 
-        for cid, (_, prereqs, _) in course_dict.items():
-            dag.setdefault(cid, [])
-            for p in prereqs:
-                dag.setdefault(p, [])
-                dag[p].append(cid)
-        return dag
-    
-    
-    def __build_plan_dfs(self, course: str, courses_avail: dict) -> None:
+    def __compile_avail(self, courses_avail: dict) -> SlotTable:
+        # Course index -> offsets of its sessions within each plan year, in
+        # preference order. courses_avail decides which courses are offered at
+        # all; with a term store each year's sessions come from that year's
+        # snapshot, otherwise every year shares the courses_avail offsets
+        if isinstance(courses_avail, AvailabilityIndex):
+            course_offsets = courses_avail.offsets(self.sessions)
+        else:
+            offsets = {s: idx for idx, s in enumerate(self.sessions)}
+            course_offsets = {
+                cid: tuple(offsets[s] for s in seasons if s in offsets) for cid, seasons in courses_avail.items()
+                }
+        index = self._catalog.index
+
+        def compile(year_offsets: dict = None) -> list:
+            table = [()] * len(self._catalog)
+            for cid, offsets in course_offsets.items():
+                if cid in index:
+                    table[index[cid]] = offsets if year_offsets is None else year_offsets.get(cid, ())
+            return table
+
+        if self.terms is None or self.start_year is None:
+            return SlotTable([compile()] * self.planned_years, len(self.sessions))
+        # terms.offsets is memoized per snapshot, so years on one snapshot share a table
+        tables = {}
+        years = []
+        for i in range(self.planned_years):
+            year_offsets = self.terms.offsets(self.start_year + i, self.sessions)
+            if id(year_offsets) not in tables:
+                tables[id(year_offsets)] = compile(year_offsets)
+            years.append(tables[id(year_offsets)])
+        return SlotTable(years, len(self.sessions))
+
+
+    def __build_plan_dfs(self, root: int, slots: SlotTable) -> None:
         # Base case
-        if course in self._visited:
+        if self._visited[root]:
             return
-        self._visited.add(course)
+        self._visited[root] = 1
+
+        # Explicit stack of (course, remaining prereqs) so prereq chains of any
+        # depth place deepest-first without recursion
+        stack = [(root, iter(self.__required(root, slots)))]
+        while stack:
+            course, prereqs = stack[-1]
 
-        # Find further node (core course / course with no prereq)
-        if self._pdag[course]:
-            for prereq in self._pdag[course]:
-                if prereq not in self._visited:
-                    self.__build_plan_dfs(prereq, courses_avail)
+            # Find further node (core course / course with no prereq)
+            for prereq in prereqs:
+                if not self._visited[prereq]:
+                    self._visited[prereq] = 1
+                    stack.append((prereq, iter(self.__required(prereq, slots))))
+                    break
+            else:
+                stack.pop()
+                self.__place_in_window(course, slots)
+
+
+    def __required(self, course: int, slots: SlotTable) -> list:
+        # One course per prereq clause not already met: clauses met by completed
+        # courses drop out with a bit test, clauses with a member already in the
+        # plan need nothing more, otherwise take the first offered alternative
+        cat = self._catalog
+        required = []
+        for clause, mask in zip(cat.clauses(course), cat.clause_masks(course)):
+            if mask & self._done_bits or any(self._visited[m] for m in clause):
+                continue
+            member = next((m for m in clause if slots.offered(m)), None)
+            if member is None and clause:
+                member = clause[0]
+            if member is not None:
+                required.append(member)
+        return required
+
+
+    def __place_in_window(self, course: int, slots: SlotTable) -> None:
+        cat = self._catalog
 
         # Lambda functions
-        def check_max_units(k: str) -> bool:
-            total_units = sum([self._cdict[c][2] for c in self._schedule[k]])
-            return total_units + self._cdict[course][2] <= self.max_units_per_sem
-        
-        def get_score(base: int, dag: dict, extrema: Callable[[int, int], int]) -> int:
-            score = base
-            for n in dag[course]:
-                for k, v in self._schedule.items():
-                    if n in v:
-                        score = extrema(score, self._session_val[k])
-            return score
+        def check_max_units(k: int) -> bool:
+            return self._slot_units[k] + cat.units[course] <= self.max_units_per_sem
 
         # Add course to schedule logic
-        min_window = get_score(-1, self._pdag, max)
-        max_window = get_score(self.planned_years * len(self.sessions), self._fdag, min)
+        lo = cat.ready_slot(course, self.__slot_of)
+        max_window = min(len(self._schedule), cat.needed_before(course, self.__slot_of))
 
-        for i in range(self.planned_years):
-            for session in courses_avail[course]:
-                k = f'{session}{i}'
-                score = self._session_val[k]
-                if check_max_units(k) and min_window < score < max_window:
-                    self._schedule[k].append(course)
+        # Slots before the first open one are full, so skip whole years below it
+        n_sessions = len(self.sessions)
+        if cat.units[course] > 0:
+            lo = max(lo, self._first_open)
+
+        for i in range(lo // n_sessions, self.planned_years):
+            if i * n_sessions >= max_window:
+                return
+            for offset in slots.years[i][course]:
+                k = i * n_sessions + offset
+                if check_max_units(k) and lo <= k < max_window:
+                    self.__place(course, k)
                     return
-    
-    
+
+
+    def __place(self, course: int, k: int) -> None:
+        self._schedule[k].append(course)
+        self._placement[course] = k
+        self._slot_units[k] += self._catalog.units[course]
+        self.__advance_first_open()
+
+
+    def __unplace(self, course: int) -> None:
+        k = self._placement[course]
+        self._schedule[k].remove(course)
+        self._placement[course] = -1
+        self._slot_units[k] -= self._catalog.units[course]
+        self._first_open = min(self._first_open, k)
+
+
+    def __advance_first_open(self) -> None:
+        while (self._first_open < len(self._schedule)
+               and self._slot_units[self._first_open] >= self.max_units_per_sem):
+            self._first_open += 1
+
+
     def fixed_core_course(self, semester: str, courses: list) -> None:
-        self._schedule[f'{semester}'] = courses
+        index = self._catalog.index
+        k = self._session_val[semester]
+        for course in self._schedule[k]:
+            self._placement[course] = -1
+            self._pinned[course] = 0
+        self._schedule[k] = []
+        self._slot_units[k] = 0
+        self._first_open = min(self._first_open, k)
         for course in courses:
-            self._visited.add(course)
+            # A course planned in another quarter moves here rather than appearing twice
+            if self._placement[index[course]] >= 0:
+                self.__unplace(index[course])
+            self.__place(index[course], k)
+            self._visited[index[course]] = 1
+            self._pinned[index[course]] = 1
+        self.__advance_first_open()
 
 
     def build_plan(self, courses_avail: dict) -> None:
+        self._courses_avail = courses_avail
+        slots = self.__compile_avail(courses_avail)
         for k in courses_avail.keys():
-            self.__build_plan_dfs(k, courses_avail)
-                
-                
+            if k in self._catalog.index:
+                self.__build_plan_dfs(self._catalog.index[k], slots)
+
+
+    def build_plan_levels(self, courses_avail: dict) -> None:
+        # Level-by-level alternative to build_plan: each quarter is filled from the
+        # bitset frontier of courses whose prereqs are complete, longest remaining
+        # chain first, instead of placing one prereq chain at a time
+        import numpy as np
+        from src.frontier import Frontier
+
+        cat = self._catalog
+        self._courses_avail = courses_avail
+        slots = self.__compile_avail(courses_avail)
+        for course in range(len(cat)):
+            if self._placement[course] >= 0 and not self._pinned[course]:
+                self.__unplace(course)
+
+        n = len(cat)
+        order = list(dict.fromkeys(cat.index[k] for k in courses_avail.keys() if k in cat.index))
+        targets = np.zeros(n, dtype=bool)
+        targets[order] = True
+        done = np.frombuffer(bytes(self._done), dtype=bool).copy()
+        targets &= ~np.frombuffer(bytes(self._pinned), dtype=bool)
+
+        # One row per (offset table, session); slot t reads row offered_row[t]
+        n_sessions = len(self.sessions)
+        offered = np.zeros((len(slots.tables) * n_sessions, n), dtype=bool)
+        for j, table in enumerate(slots.tables):
+            for course in order:
+                offered[[j * n_sessions + o for o in table[course]], course] = True
+        offered_row = np.array([slots.year_table[t // n_sessions] * n_sessions + t % n_sessions
+                                for t in range(len(self._schedule))], dtype=np.int64)
+
+        # Longest chain of target dependents, so long chains start first
+        height = [0] * n
+        for course in reversed(self.__topological(order)):
+            for d in cat.dependents(course):
+                if targets[d]:
+                    height[course] = max(height[course], height[d] + 1)
+        rank = np.zeros(n, dtype=np.int64)
+        for i, course in enumerate(sorted(order, key=lambda c: -height[c])):
+            rank[course] = i
+
+        deadline = np.full(n, len(self._schedule), dtype=np.int64)
+        for course in order:
+            deadline[course] = min(len(self._schedule), cat.needed_before(course, self.__slot_of))
+
+        placements = Frontier(cat).schedule(
+            targets=targets,
+            rank=rank,
+            offered=offered,
+            offered_row=offered_row,
+            units=np.frombuffer(cat.units, dtype=np.float64),
+            max_units=self.max_units_per_sem,
+            done=done,
+            pinned=[[c for c in v if self._pinned[c]] for v in self._schedule],
+            slot_units=np.frombuffer(self._slot_units, dtype=np.float64).copy(),
+            deadline=deadline
+            )
+        for course, k in placements:
+            self.__place(course, k)
+        for course in order:
+            self._visited[course] = 1
+
+
+    def __topological(self, courses: list) -> list:
+        # Kahn's order over the given courses, prereqs first; courses on a cycle
+        # never reach in-degree zero and are appended last
+        cat = self._catalog
+        wanted = set(courses)
+        indegree = {c: sum(1 for p in cat.prereqs(c) if p in wanted) for c in courses}
+        queue = [c for c in courses if indegree[c] == 0]
+        for course in queue:
+            for d in cat.dependents(course):
+                if d in wanted:
+                    indegree[d] -= 1
+                    if indegree[d] == 0:
+                        queue.append(d)
+        seen = set(queue)
+        return queue + [c for c in courses if c not in seen]
+
+
+    def __closure(self, course: int, ancestors: bool = True, descendants: bool = True) -> set:
+        bits = 1 << course
+        if ancestors:
+            bits |= self.closure.ancestors_bits[course]
+        if descendants:
+            bits |= self.closure.descendants_bits[course]
+        return set(ClosureIndex.bits_to_indices(bits))
+
+
+    def __apply_delta(self, delta: PlanDelta) -> set:
+        # Update the inputs and return the course indices whose placement may change
+        index = self._catalog.index
+
+        if delta.kind in ('complete', 'uncomplete') and delta.course not in index:
+            # Outside this catalog, nothing here depends on it
+            if delta.kind == 'complete' and delta.course not in self.completed_courses:
+                self.completed_courses.append(delta.course)
+            if delta.kind == 'uncomplete' and delta.course in self.completed_courses:
+                self.completed_courses.remove(delta.course)
+            return set()
+
+        if delta.kind in ('pin', 'unpin', 'complete', 'uncomplete'):
+            course = index[delta.course]
+            if self._placement[course] >= 0:
+                self.__unplace(course)
+            self._pinned[course] = 0
+
+            if delta.kind == 'pin':
+                # A pinned course is taken in that quarter, so it is no longer
+                # completed; its dependents then have to follow it
+                if self._done[course]:
+                    self.__set_done(course, False)
+                    if delta.course in self.completed_courses:
+                        self.completed_courses.remove(delta.course)
+                k = self._session_val[delta.semester]
+                self.__place(course, k)
+                self._pinned[course] = 1
+                affected = self.__closure(course) - {course}
+                # A pin into a full quarter pushes the planned courses there out
+                if self._slot_units[k] > self.max_units_per_sem:
+                    for other in self._schedule[k]:
+                        if not self._pinned[other]:
+                            affected |= self.__closure(other)
+                return affected
+            if delta.kind == 'complete':
+                self.__set_done(course, True)
+                if delta.course not in self.completed_courses:
+                    self.completed_courses.append(delta.course)
+                return self.__closure(course, ancestors=False) - {course}
+            if delta.kind == 'uncomplete':
+                self.__set_done(course, False)
+                if delta.course in self.completed_courses:
+                    self.completed_courses.remove(delta.course)
+                return self.__closure(course, ancestors=False)
+            return self.__closure(course)
+
+        if delta.kind == 'max_units':
+            lowered = delta.value < self.max_units_per_sem
+            self.max_units_per_sem = delta.value
+            self._first_open = 0
+            self.__advance_first_open()
+            if not lowered:
+                # More room, so retry everything the last pass could not fit
+                return {c for c in range(len(self._catalog)) if self._visited[c] and self._placement[c] < 0}
+            affected = set()
+            for k, slot in enumerate(self._schedule):
+                if self._slot_units[k] > self.max_units_per_sem:
+                    for course in slot:
+                        if not self._pinned[course]:
+                            affected |= self.__closure(course)
+            return affected
+
+        if delta.kind == 'sessions':
+            return self.__remap_sessions(list(delta.value))
+
+        raise ValueError(f'Unknown plan delta: {delta.kind}')
+
+
+    def __remap_sessions(self, sessions: list) -> set:
+        old_val, old_schedule, old_units = self._session_val, self._schedule, self._slot_units
+        self.sessions = sessions
+        self._session_val = {
+            f'{s}{i}': i*len(self.sessions) + idx
+                for i in range(self.planned_years)
+                for idx, s in enumerate(self.sessions)
+            }
+        self._schedule = [[] for _ in self._session_val]
+        self._slot_units = array('d', bytes(8 * len(self._schedule)))
+
+        affected = set()
+        for name, k_old in old_val.items():
+            k = self._session_val.get(name)
+            for course in old_schedule[k_old]:
+                if k is None:
+                    self._placement[course] = -1
+                    self._pinned[course] = 0
+                    affected |= self.__closure(course)
+                else:
+                    self._placement[course] = k
+            if k is not None:
+                self._schedule[k] = old_schedule[k_old]
+                self._slot_units[k] = old_units[k_old]
+
+        # Kept sessions keep their courses, but a new session order can put a
+        # prereq in the same or a later slot than its dependent; replan both
+        placement = self._placement
+        for course in range(len(self._catalog)):
+            k = placement[course]
+            if k >= 0 and any(placement[p] >= k for p in self._catalog.prereqs(course)):
+                affected |= self.__closure(course)
+
+        self._first_open = 0
+        self.__advance_first_open()
+        # New sessions may fit courses the last pass dropped
+        return affected | {c for c in range(len(self._catalog)) if self._visited[c] and self._placement[c] < 0}
+
+
+    def replan(self, deltas: list) -> set:
+        affected = set()
+        for delta in deltas:
+            affected |= self.__apply_delta(delta)
+
+        # Nothing planned yet, the deltas only update the inputs
+        if self._courses_avail is None:
+            return affected
+
+        # Lift affected planned courses out, then rerun placement on just those;
+        # every other course stays visited and keeps its slot
+        for course in affected:
+            if self._placement[course] >= 0 and not self._pinned[course]:
+                self.__unplace(course)
+        self._visited = bytearray(b'\x01') * len(self._catalog)
+        for course in affected:
+            if not self._done[course] and not self._pinned[course]:
+                self._visited[course] = 0
+        self._first_open = 0
+        self.__advance_first_open()
+
+        slots = self.__compile_avail(self._courses_avail)
+        for k in self._courses_avail.keys():
+            if k in self._catalog.index:
+                self.__build_plan_dfs(self._catalog.index[k], slots)
+        return affected
+
+
+    def iter_plans(self, courses_avail: dict, k: int = 5, max_nodes: int = 100000, time_limit: float = None) -> Iterator[Plan]:
+        slots = self.__compile_avail(courses_avail)
+        courses = [self._catalog.index[c] for c in courses_avail.keys() if c in self._catalog.index]
+        return PlanSearch(self, slots, courses).iter_plans(k, max_nodes, time_limit)
+
+
+    def exact_solver(self, courses_avail: dict, balance: bool = False) -> ExactSolver:
+        slots = self.__compile_avail(courses_avail)
+        courses = [self._catalog.index[c] for c in courses_avail.keys() if c in self._catalog.index]
+        return ExactSolver(self, slots, courses, balance)
+
+
+    def solve_exact(self, courses_avail: dict, time_limit: float = 10, balance: bool = False) -> Plan:
+        return self.exact_solver(courses_avail, balance).solve(time_limit)
+
+
+    def to_dataframe(self):
+        # One column per semester, shorter semesters padded with blanks; pandas
+        # is only imported for the export so planning never pays for it
+        import pandas as pd
+        schedule = self.schedule
+        rows = max(map(len, schedule.values()), default=0)
+        return pd.DataFrame({k: v + [''] * (rows - len(v)) for k, v in schedule.items()})
+
+
     def display_schedule(self) -> None:
         print('-'*50, '\n')
-        for k, v in self._schedule.items():
+        for k, v in self.schedule.items():
             print(f'{k}: {v}')
         print()
-        print('-'*50, '\n')
\ No newline at end of file
+        print('-'*50, '\n')
@@ -2,9 +2,9 @@
 NO LONGER WORKS SINCE ICS UPDATED THEIR SITE
 """
 
-import pandas as pd
 from urllib.request import urlopen
 from typing import NamedTuple
+from src.loaders import read_availability
 
 
 class UCIScaperIdentifier(NamedTuple):
@@ -58,6 +58,7 @@ def scrape_avail_listings(year: int, department: str, level: str = 'ALL', progra
 
 
 def scape_save_csv(file_path: str, data: dict) -> None:
+    import pandas as pd
     for k, v in data.items():
         data[k] = '+'.join(v)
 
@@ -66,15 +67,7 @@ def scape_save_csv(file_path: str, data: dict) -> None:
 
 
 def scape_read_csv(file_path: str) -> dict:
-    df = pd.read_csv(file_path)
-    course_dict = {}
-
-    for _, row in df.iterrows():
-        course_id = row['Course']
-        availability = row['Availability']
-        course_dict[course_id] = [] if pd.isnull(availability) else availability.split('+')
-
-    return course_dict
+    return read_availability(file_path)
 
 
 
@@ -0,0 +1,307 @@
+import heapq
+import math
+import time
+from array import array
+from bisect import insort
+from itertools import count
+from typing import Callable, Iterator, NamedTuple
+from src.availability import SlotTable
+from src.catalog import NEVER
+
+
+class Plan(NamedTuple):
+    # score = (dropped courses, quarters spanned), lower is better
+    score: tuple
+    schedule: dict
+    dropped: list
+
+
+class _Node(NamedTuple):
+    depth: int
+    pos: array
+    units: array
+    dropped: int
+    span: int
+
+
+class PlanSearch:
+    def __init__(self, planner, slots: SlotTable, courses: list) -> None:
+        self._planner = planner
+        self._cat = planner.catalog
+        self._slots = slots
+        self._n_slots = len(planner._schedule)
+        self._max_units = planner.max_units_per_sem
+
+        # Search around pinned courses only, not whatever build_plan placed
+        pinned, done = planner._pinned, planner._done
+        self._base = array('i', [-1]) * len(self._cat)
+        self._base_slots = [[c for c in v if pinned[c]] for v in planner._schedule]
+        self._base_units = array('d', bytes(8 * self._n_slots))
+        for k, slot in enumerate(self._base_slots):
+            for c in slot:
+                self._base[c] = k
+                self._base_units[k] += self._cat.units[c]
+        visited = bytearray(a | b for a, b in zip(pinned, done))
+        self._done = done
+        self._done_bits = planner._done_bits
+
+        order, self._unavailable = self.__targets(courses, visited)
+        self._order = order
+        self._local = {c: i for i, c in enumerate(order)}
+        self._est = array('i', [-1]) * len(order)
+
+
+    def __targets(self, courses: list, visited: bytearray) -> tuple:
+        # Courses to place plus the prereqs they need, prereqs first (post-order)
+        seen = set()
+        order = []
+        for root in courses:
+            if visited[root] or root in seen:
+                continue
+            seen.add(root)
+            stack = [(root, iter(self.__required(root, visited, seen)))]
+            while stack:
+                node, it = stack[-1]
+                for p in it:
+                    if not visited[p] and p not in seen:
+                        seen.add(p)
+                        stack.append((p, iter(self.__required(p, visited, seen))))
+                        break
+                else:
+                    stack.pop()
+                    order.append(node)
+        return [c for c in order if self._slots.offered(c)], [c for c in order if not self._slots.offered(c)]
+
+
+    def __required(self, course: int, visited: bytearray, seen: set) -> list:
+        # Same choice as the planner: one offered member per clause not yet met
+        cat = self._cat
+        required = []
+        for clause, mask in zip(cat.clauses(course), cat.clause_masks(course)):
+            if mask & self._done_bits or any(visited[m] or m in seen for m in clause):
+                continue
+            member = next((m for m in clause if self._slots.offered(m)), None)
+            if member is None and clause:
+                member = clause[0]
+            if member is not None:
+                required.append(member)
+        return required
+
+
+    def _slot_of(self, course: int, pos: array, depth: int) -> int:
+        if self._done[course]:
+            return -1
+        i = self._local.get(course)
+        if i is None:
+            k = self._base[course]
+        else:
+            k = pos[i] if i < depth else -1
+        return k if k >= 0 else NEVER
+
+
+    def _window(self, course: int, pos: array, depth: int) -> tuple:
+        slot_of = lambda c: self._slot_of(c, pos, depth)
+        return self._cat.ready_slot(course, slot_of), min(self._n_slots, self._cat.needed_before(course, slot_of))
+
+
+    def _candidates(self, node: _Node) -> list:
+        course = self._order[node.depth]
+        lo, hi = self._window(course, node.pos, node.depth)
+        need = self._max_units - self._cat.units[course]
+        return [k for k in self._slots.slots(course, lo, hi) if node.units[k] <= need]
+
+
+    def _first_offered(self, course: int, lo: int, hi: int) -> int:
+        # Earliest offered slot in [lo, hi): the first year with one decides
+        n = self._slots.n_sessions
+        for i in range(max(lo, 0) // n, (min(hi, self._n_slots) + n - 1) // n):
+            ks = [i * n + o for o in self._slots.years[i][course] if lo <= i * n + o < hi]
+            if ks:
+                return min(ks)
+        return -1
+
+
+    def _estimate(self, node: _Node) -> tuple:
+        # Lower bound on (dropped, span) of any completion of node, plus the units
+        # still to place. A course is certainly dropped only if it has no offered
+        # slot in the window left by decided courses alone: an undecided prereq
+        # may itself be dropped, and then it holds nothing back. The span takes
+        # the critical path through estimated prereq slots, which only binds
+        # completions that drop nothing more, the only ones it needs to bound
+        est = self._est
+        units = self._cat.units
+        dropped, span, remaining, largest = node.dropped, node.span, 0, 0
+        for j in range(node.depth, len(self._order)):
+            course = self._order[j]
+            lo, hi = self._window(course, node.pos, node.depth)
+            if units[course] > self._max_units or self._first_offered(course, lo, hi) < 0:
+                est[j] = -1
+                dropped += 1
+                continue
+            remaining += units[course]
+            largest = max(largest, units[course])
+            lo = self._cat.ready_slot(course, lambda c: self.__est_slot(c, node, j))
+            k = est[j] = self._first_offered(course, lo, hi)
+            if k >= 0:
+                span = max(span, k + 1)
+
+        # Unit capacity: the remaining units need at least this many quarters' free room
+        q, left = 0, remaining
+        while left > 0 and q < self._n_slots:
+            left -= max(0, self._max_units - node.units[q])
+            q += 1
+        if left > 0:
+            # Not everything fits, so some courses must be dropped; which ones is
+            # open, so only the span already placed is certain
+            return dropped + math.ceil(left / largest), node.span, remaining
+        return dropped, max(span, q), remaining
+
+
+    def __est_slot(self, course: int, node: _Node, j: int) -> int:
+        # Decided courses use their slot, undecided ones estimated earlier in this
+        # pass use their estimate, anything else cannot hold a course back
+        i = self._local.get(course)
+        if i is not None and node.depth <= i:
+            return self._est[i] if i < j and self._est[i] >= 0 else NEVER
+        return self._slot_of(course, node.pos, node.depth)
+
+
+    def _bound(self, node: _Node) -> tuple:
+        dropped, span, _ = self._estimate(node)
+        return dropped, span
+
+
+    def _children(self, node: _Node) -> Iterator[_Node]:
+        course = self._order[node.depth]
+        candidates = self._candidates(node)
+        if not candidates:
+            yield node._replace(depth=node.depth + 1, dropped=node.dropped + 1)
+            return
+        for k in candidates:
+            pos = array('i', node.pos)
+            pos[node.depth] = k
+            units = array('d', node.units)
+            units[k] += self._cat.units[course]
+            yield _Node(node.depth + 1, pos, units, node.dropped, max(node.span, k + 1))
+
+
+    def _root(self) -> _Node:
+        span = max((k + 1 for k, v in enumerate(self._base_slots) if v), default=0)
+        return _Node(0, array('i', [-1]) * len(self._order), array('d', self._base_units), 0, span)
+
+
+    def _to_plan(self, node: _Node) -> Plan:
+        ids = self._cat.ids
+        slots = [list(v) for v in self._base_slots]
+        dropped = []
+        for i, course in enumerate(self._order):
+            if node.pos[i] >= 0:
+                slots[node.pos[i]].append(course)
+            else:
+                dropped.append(ids[course])
+        schedule = {k: [ids[c] for c in slots[v]] for k, v in self._planner._session_val.items()}
+        dropped.extend(ids[c] for c in self._unavailable)
+        return Plan((node.dropped, node.span), schedule, dropped)
+
+
+    def iter_plans(self, k: int = 5, max_nodes: int = 100000, time_limit: float = None) -> Iterator[Plan]:
+        # Best-first over partial plans keyed by an admissible bound, so complete
+        # plans pop in score order; deeper nodes win ties to reach plans sooner
+        deadline = None if time_limit is None else time.perf_counter() + time_limit
+        tie = count()
+        root = self._root()
+        heap = [(self._bound(root), -root.depth, next(tie), root)]
+        best = []
+        yielded = expanded = 0
+
+        while heap and yielded < k:
+            if expanded >= max_nodes or (deadline and time.perf_counter() > deadline):
+                return
+            bound, _, _, node = heapq.heappop(heap)
+            if node.depth == len(self._order):
+                yield self._to_plan(node)
+                yielded += 1
+                continue
+
+            expanded += 1
+            for child in self._children(node):
+                b = self._bound(child)
+                # Prune anything that cannot beat the current K-th complete plan
+                if len(best) >= k and b >= best[-1]:
+                    continue
+                if child.depth == len(self._order):
+                    insort(best, b)
+                    del best[k:]
+                heapq.heappush(heap, (b, -child.depth, next(tie), child))
+
+
+class ExactSolver(PlanSearch):
+    # Depth-first branch-and-bound minimising (dropped, quarters spanned) and,
+    # with balance=True, the unit spread across those quarters. The incumbent
+    # is kept on the solver so callers can read the best plan at any time.
+    def __init__(self, planner, slots: SlotTable, courses: list, balance: bool = False) -> None:
+        super().__init__(planner, slots, courses)
+        self.balance = balance
+        self.incumbent = None
+        self.optimal = False
+        self.nodes = 0
+
+
+    def _score(self, node: _Node) -> tuple:
+        if not self.balance:
+            return node.dropped, node.span
+        # Spread over the quarters that carry units; empty quarters (e.g. before
+        # the first course) are not part of the load being balanced
+        used = [u for u in node.units if u > 0]
+        return node.dropped, node.span, (max(used) - min(used)) if used else 0
+
+
+    def _objective_bound(self, node: _Node) -> tuple:
+        dropped, span, remaining = self._estimate(node)
+        if not self.balance:
+            return dropped, span
+        # Loads only grow, so the heaviest quarter is at least today's. The
+        # lightest loaded quarter is at most the final mean, and that mean is at
+        # most every unit still to place spread over the quarters loaded today
+        used = [u for u in node.units if u > 0]
+        if not used:
+            return dropped, span, 0
+        return dropped, span, max(0, max(used) - (sum(used) + remaining) / len(used))
+
+
+    def solve(self, time_limit: float = None, max_nodes: int = None, on_incumbent: Callable[[Plan], None] = None) -> Plan:
+        deadline = None if time_limit is None else time.perf_counter() + time_limit
+        root = self._root()
+        root_bound = self._objective_bound(root)
+        stack = [(root_bound, root)]
+        best = None
+
+        while stack:
+            if (max_nodes is not None and self.nodes >= max_nodes) or (deadline and time.perf_counter() > deadline):
+                return self.incumbent
+            bound, node = stack.pop()
+            if best is not None and bound >= best:
+                continue
+
+            if node.depth == len(self._order):
+                # The bound of a complete plan can undercut its score, so compare the score
+                score = self._score(node)
+                if best is not None and score >= best:
+                    continue
+                best = score
+                self.incumbent = self._to_plan(node)._replace(score=best)
+                if on_incumbent:
+                    on_incumbent(self.incumbent)
+                if best <= root_bound:
+                    break
+                continue
+
+            self.nodes += 1
+            children = [(self._objective_bound(c), i, c) for i, c in enumerate(self._children(node))]
+            # Push worst first so the most promising child is explored next
+            for b, _, child in sorted(children, reverse=True):
+                if best is None or b < best:
+                    stack.append((b, child))
+
+        self.optimal = True
+        return self.incumbent
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import NamedTuple
+from src.availability import AvailabilityIndex
+from src.catalog import Catalog, read_json_rows
+from src.loaders import read_availability, read_catalog_rows
+
+
+# Binary catalog snapshot, laid out as
+#   magic (8s) | version (I) | header length (I) | JSON header | sections
+# The header records the sha256 of the source files, the byte order and each
+# section's (offset, typecode, length); sections start on 8-byte boundaries so
+# readers can memoryview.cast them straight out of the mmap.
+
+MAGIC = b'CPSNAP\x00\x00'
+VERSION = 1
+_PREFIX = struct.Struct('<8sII')
+
+# Availability masks carry one bit per header session plus this "listed" bit,
+# telling a course offered in no session apart from one not in the file
+LISTED = 1 << 31
+
+_ARRAYS = ('units', 'pre_ptr', 'pre_idx', 'dep_ptr', 'dep_idx', 'prog_ptr', 'clause_ptr', 'clause_idx')
+
+
+class Snapshot(NamedTuple):
+    catalog: Catalog
+    # Per interned course, sessions bitmask over `sessions` (| LISTED)
+    avail_masks: memoryview
+    sessions: tuple
+    source_hash: str
+
+    @property
+    def availability(self) -> AvailabilityIndex:
+        # {course id: [sessions]} for catalog courses listed in the availability file
+        ids = self.catalog.ids
+        return AvailabilityIndex({
+            ids[i]: [s for b, s in enumerate(self.sessions) if mask & (1 << b)]
+            for i, mask in enumerate(self.avail_masks) if mask & LISTED
+            }, self.sessions)
+
+
+def source_hash(paths: list) -> str:
+    digest = hashlib.sha256(f'v{VERSION}'.encode())
+    for path in paths:
+        with open(path, 'rb') as f:
+            content = f.read()
+        digest.update(f'{os.path.basename(path)}:{len(content)}:'.encode())
+        digest.update(content)
+    return digest.hexdigest()
+
+
+def compile_snapshot(catalog_paths: list, availability_path: str = None) -> tuple:
+    # Sources -> (catalog, availability masks, sessions)
+    rows = []
+    for path in catalog_paths:
+        rows += read_json_rows(path) if path.endswith('.json') else read_catalog_rows(path)
+    catalog = Catalog.from_rows(rows)
+
+    masks = array('I', bytes(4 * len(catalog)))
+    sessions = []
+    if availability_path:
+        for cid, seasons in read_availability(availability_path).items():
+            i = catalog.index.get(cid)
+            if i is None:
+                continue
+            mask = LISTED
+            for s in seasons:
+                if s not in sessions:
+                    sessions.append(s)
+                mask |= 1 << sessions.index(s)
+            masks[i] = mask
+    return catalog, masks, sessions
+
+
+def _strings(values) -> array:
+    return array('B', '\x00'.join(values).encode('utf-8'))
+
+
+def write_snapshot(path: str, catalog: Catalog, masks: array, sessions: list, digest: str) -> None:
+    sections = {name: getattr(catalog, name) for name in _ARRAYS}
+    sections['ids'] = _strings(catalog.ids)
+    sections['titles'] = _strings(catalog.titles)
+    sections['avail'] = masks
+
+    layout, offset = {}, 0
+    for name, data in sections.items():
+        layout[name] = [offset, data.typecode, len(data)]
+        offset += -(-len(data) * data.itemsize // 8) * 8
+    header = json.dumps({
+        'source_hash': digest,
+        'byteorder': sys.byteorder,
+        'n': len(catalog),
+        'n_courses': catalog.n_courses,
+        'sessions': sessions,
+        'sections': layout
+        }).encode('utf-8')
+    header += b' ' * (-(_PREFIX.size + len(header)) % 8)
+    base = _PREFIX.size + len(header)
+
+    # Written beside the target then renamed, so readers never map a partial file
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(_PREFIX.pack(MAGIC, VERSION, len(header)))
+        f.write(header)
+        for name, data in sections.items():
+            f.seek(base + layout[name][0])
+            f.write(data.tobytes())
+        f.truncate(base + offset)
+    os.replace(tmp, path)
+
+
+def read_header(path: str) -> dict:
+    # None if the file is missing or not a snapshot this version can map
+    try:
+        with open(path, 'rb') as f:
+            magic, version, size = _PREFIX.unpack(f.read(_PREFIX.size))
+            if magic != MAGIC or version != VERSION:
+                return None
+            header = json.loads(f.read(size))
+    except (OSError, struct.error, ValueError):
+        return None
+    return header if header.get('byteorder') == sys.byteorder else None
+
+
+def open_snapshot(path: str) -> Snapshot:
+    with open(path, 'rb') as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    _, _, size = _PREFIX.unpack_from(buf)
+    header = json.loads(buf[_PREFIX.size:_PREFIX.size + size])
+    base = _PREFIX.size + size
+    view = memoryview(buf)
+
+    # Numeric sections stay zero-copy views onto the shared mapping; only the
+    # strings are decoded, since the id -> index dict needs Python objects
+    def section(name: str) -> memoryview:
+        offset, typecode, length = header['sections'][name]
+        start = base + offset
+        return view[start:start + length * array(typecode).itemsize].cast(typecode)
+
+    def strings(name: str) -> tuple:
+        return tuple(bytes(section(name)).decode('utf-8').split('\x00')) if header['n'] else ()
+
+    ids = strings('ids')
+    titles = strings('titles')
+    catalog = Catalog(
+        ids=ids,
+        index={cid: i for i, cid in enumerate(ids)},
+        titles=titles,
+        n_courses=header['n_courses'],
+        **{name: section(name) for name in _ARRAYS}
+        )
+    return Snapshot(catalog, section('avail'), tuple(header['sessions']), header['source_hash'])
+
+
+def load_snapshot(catalog_paths: list, snapshot_path: str, availability_path: str = None) -> Snapshot:
+    # Map the snapshot if it was compiled from exactly these source contents,
+    # otherwise recompile it first
+    sources = list(catalog_paths) + ([availability_path] if availability_path else [])
+    digest = source_hash(sources)
+    header = read_header(snapshot_path)
+    if header is None or header['source_hash'] != digest:
+        write_snapshot(snapshot_path, *compile_snapshot(catalog_paths, availability_path), digest)
+    return open_snapshot(snapshot_path)
@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+
+
+# Startup regression check: import the planning path in a fresh interpreter
+# under -X importtime and fail if a heavy library sneaks in or the cumulative
+# import time of the module goes over budget.
+#
+#   python -m src.startup [budget_ms]
+
+HEAVY = ('pandas', 'numpy', 'networkx', 'matplotlib', 'streamlit')
+MODULES = ('src.catalog', 'src.loaders', 'src.search', 'src.planner', 'src.batch', 'src.scraper', 'src.graph')
+
+
+def import_times(module: str) -> dict:
+    # {imported module: cumulative microseconds} as reported by -X importtime
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=root, capture_output=True, text=True, check=True
+        )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def check(module: str, budget_ms: float) -> tuple:
+    times = import_times(module)
+    problems = [f'{module} imports {name}' for name in times if name.split('.')[0] in HEAVY]
+    total_ms = times.get(module, 0) / 1000
+    if total_ms > budget_ms:
+        problems.append(f'{module} took {total_ms:.1f} ms to import (budget {budget_ms} ms)')
+    return total_ms, problems
+
+
+def main():
+    budget_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 150
+    problems = []
+    for module in MODULES:
+        total_ms, found = check(module, budget_ms)
+        problems += found
+        print(f'{module:<14} {total_ms:>8.1f} ms  {"FAIL" if found else "ok"}')
+    for p in problems:
+        print(p)
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+import argparse
+import csv
+import os
+from array import array
+from bisect import bisect_right, insort
+from src.closure import ClosureIndex
+from src.loaders import read_availability, read_term_availability
+
+
+class TermAvailability:
+    # Availability keyed by (course, academic year, session): three parallel
+    # columns with courses and sessions interned to ints, one row per offering.
+    # Each academic year is a snapshot that is added or replaced on its own.
+    # Per (year, session) the store also keeps a bitmask over course indices,
+    # so "offered in Fall of year y" is a single lookup and whole terms can be
+    # combined bitwise. A year without a snapshot of its own uses the closest
+    # earlier one, or the earliest snapshot for years before any.
+    def __init__(self) -> None:
+        self.ids = []
+        self.index = {}
+        self.sessions = []
+        self.years = []
+        self.course_col = array('i')
+        self.year_col = array('i')
+        self.session_col = array('i')
+        self._session_index = {}
+        self._masks = {}
+        self._offsets = {}
+
+
+    def __len__(self) -> int:
+        return len(self.course_col)
+
+
+    def __intern(self, values: list, index: dict, value: str) -> int:
+        i = index.get(value)
+        if i is None:
+            i = index[value] = len(values)
+            values.append(value)
+        return i
+
+
+    def __drop_year(self, year: int) -> None:
+        keep = [r for r, y in enumerate(self.year_col) if y != year]
+        if len(keep) != len(self.year_col):
+            self.course_col = array('i', (self.course_col[r] for r in keep))
+            self.year_col = array('i', (self.year_col[r] for r in keep))
+            self.session_col = array('i', (self.session_col[r] for r in keep))
+        for key in [key for key in self._masks if key[0] == year]:
+            del self._masks[key]
+
+
+    def add_year(self, year: int, availability: dict) -> None:
+        # Replace year's snapshot with availability ({course id: [sessions]});
+        # other years' rows are left as they are
+        self.__drop_year(year)
+        for cid, seasons in availability.items():
+            c = self.__intern(self.ids, self.index, cid)
+            for s in dict.fromkeys(seasons):
+                j = self.__intern(self.sessions, self._session_index, s)
+                self.course_col.append(c)
+                self.year_col.append(year)
+                self.session_col.append(j)
+                self._masks[year, j] = self._masks.get((year, j), 0) | 1 << c
+        if year not in self.years:
+            insort(self.years, year)
+        self._offsets.clear()
+
+
+    def resolve(self, year: int) -> int:
+        # Snapshot year that answers for year, None while the store is empty
+        if not self.years:
+            return None
+        i = bisect_right(self.years, year)
+        return self.years[i - 1] if i else self.years[0]
+
+
+    def offered(self, year: int, session: str) -> int:
+        # Bitmask over course indices of everything offered in session of year
+        return self._masks.get((self.resolve(year), self._session_index.get(session)), 0)
+
+
+    def courses(self, year: int, session: str) -> list:
+        return [self.ids[c] for c in ClosureIndex.bits_to_indices(self.offered(year, session))]
+
+
+    def is_offered(self, course: str, year: int, session: str) -> bool:
+        c = self.index.get(course)
+        return c is not None and bool(self.offered(year, session) >> c & 1)
+
+
+    def sessions_of(self, course: str, year: int) -> list:
+        return [s for s in self.sessions if self.is_offered(course, year, s)]
+
+
+    def offsets(self, year: int, sessions: list) -> dict:
+        # {course id: offsets into a planner's session list offered in year}
+        key = (self.resolve(year), tuple(sessions))
+        offsets = self._offsets.get(key)
+        if offsets is None:
+            offsets = {}
+            for o, s in enumerate(key[1]):
+                for c in ClosureIndex.bits_to_indices(self.offered(year, s)):
+                    offsets.setdefault(self.ids[c], []).append(o)
+            offsets = self._offsets[key] = {cid: tuple(o) for cid, o in offsets.items()}
+        return offsets
+
+
+    @classmethod
+    def load(cls, path: str) -> 'TermAvailability':
+        by_year = {}
+        for cid, year, session in read_term_availability(path):
+            by_year.setdefault(year, {}).setdefault(cid, []).append(session)
+        store = cls()
+        for year, availability in by_year.items():
+            store.add_year(year, availability)
+        return store
+
+
+    @classmethod
+    def from_snapshots(cls, snapshots: dict) -> 'TermAvailability':
+        # {academic year: courses_availability.csv-style path}
+        store = cls()
+        for year, path in sorted(snapshots.items()):
+            store.add_year(year, read_availability(path))
+        return store
+
+
+    def save(self, path: str) -> None:
+        # Course,Year,Session rows, year by year; written beside path then renamed
+        order = sorted(range(len(self)), key=lambda r: self.year_col[r])
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Course', 'Year', 'Session'])
+            for r in order:
+                writer.writerow([self.ids[self.course_col[r]], self.year_col[r], self.sessions[self.session_col[r]]])
+        os.replace(tmp, path)
+
+
+def update_store(store_path: str, year: int, availability_path: str) -> TermAvailability:
+    # Fold one year's availability snapshot into the store file, creating it if needed
+    store = TermAvailability.load(store_path) if os.path.exists(store_path) else TermAvailability()
+    store.add_year(year, read_availability(availability_path))
+    store.save(store_path)
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Add a year of course availability to the term store')
+    parser.add_argument('year', type=int, help='academic (start) year the snapshot covers')
+    parser.add_argument('availability', help='Course,Availability csv for that year')
+    parser.add_argument('--store', default='data/courses_availability_terms.csv')
+    args = parser.parse_args()
+
+    store = update_store(args.store, args.year, args.availability)
+    print(f'{args.store}: {len(store)} offerings of {len(store.ids)} courses, years {store.years}')
+
+
+if __name__ == '__main__':
+    main()
@@ -26,6 +26,12 @@ def main():
     p.fixed_core_course('Winter0', ['ICS 6D', 'ICS 139W', 'INF 101', 'INF 113'])
     p.fixed_core_course('Winter1', ['CS 161'])
 
+    for plan in p.iter_plans(courses_avail, k=3, time_limit=5):
+        print(plan.score, plan.dropped)
+        for k, v in plan.schedule.items():
+            print(f'{k}: {v}')
+        print()
+
     p.build_plan(courses_avail)
 
     p.display_schedule()
@@ -36,7 +42,7 @@ if __name__ == '__main__':
 
 
 # TODO:
-# [ ] Display multiple possible schedules
+# [x] Display multiple possible schedules
 
 # [ ] Check for Summer classes, current scape doesn't include them
 # [ ] Ability to remove quarters, e.g. Remove Winter
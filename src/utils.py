@@ -1,40 +1,42 @@
-import networkx as nx
+import os
 import streamlit as st
 from typing import Type
-from collections import deque
-from functools import lru_cache
+from src import graph
+from src.graph import dag_leveler
 from src.scraper import scape_read_csv
+from src.availability import AvailabilityIndex
+from src.terms import TermAvailability
+from src.cache import PlannerCache
 from src.planner import CoursePlanner
 
 
 
-@st.cache_data
-def load_availability(path: str) -> dict:
-    return scape_read_csv(path)
+@st.cache_resource
+def load_availability(path: str) -> AvailabilityIndex:
+    # Shared rather than copied per rerun, so its memoized views persist
+    return AvailabilityIndex(scape_read_csv(path))
 
 
-@st.cache_data
-def topological_sort(dag: dict) -> dict:
-    @lru_cache(maxsize=10)
-    def dfs(course: str) -> None:
-        visited.add(course)
-        for prereq in dag[course]:
-            if prereq not in visited:
-                dfs(prereq)
-        topo_order[course] = dag[course]
+@st.cache_resource
+def load_terms(path: str) -> TermAvailability:
+    # Availability per academic year, None until a store has been built
+    return TermAvailability.load(path) if os.path.exists(path) else None
 
-    visited = set()
-    topo_order = {}
 
-    for course in dag:
-        if course not in visited:
-            dfs(course)
+@st.cache_resource
+def planner_cache() -> PlannerCache:
+    # One template cache per server process, shared by every session
+    return PlannerCache()
+
 
-    return topo_order
+@st.cache_data
+def topological_sort(dag: dict) -> dict:
+    return graph.topological_sort(dag)
 
 
 @st.cache_resource
 def plot_dag(pdag: dict):
+    import networkx as nx
     dag = topological_sort(pdag)
     G = nx.Graph()
 
@@ -74,49 +76,3 @@ def update_plot_dag(plan: Type[CoursePlanner]) -> None:
         plot_dag(pdag)
     except:
         st.warning('Slow down - Add one course at a time', icon="⚠️")
-
-
-def dag_leveler(dag) -> list:
-    def bfs(adj_list: dict) -> dict:
-        levels = {}
-        visited = set()
-        q = deque()
-
-        snode = next(iter(adj_list.keys()))
-        q.append((snode, 0))  # Add the start node with level 0
-        visited.add(snode)
-        levels[snode] = 0
-
-        while q:
-            node, i = q.popleft()
-            for n in adj_list[node]:
-                if n not in visited:
-                    q.append((n, i + 1))
-                    visited.add(n)
-                    levels[n] = i + 1
-        return levels
-    
-    mult_dag = []
-    al_copy = dag.copy()
-
-    for i, (k, v) in enumerate(dag.items()):
-        mult_dag.append(bfs(al_copy))
-        al_copy.pop(k)
-        al_copy[k] = v
-        if i > len(dag):
-            break
-
-    idxs = []
-    for i, d1 in enumerate(mult_dag):
-        for j, d2 in enumerate(mult_dag):
-            if i == j:
-                continue
-            
-            if set(d1.keys()).issubset(set(d2.keys())):
-                idxs.append(i)
-                break
-
-    for idx in reversed(idxs):
-        mult_dag.pop(idx)
-
-    return mult_dag